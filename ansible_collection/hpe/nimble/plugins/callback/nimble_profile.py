@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+# Copyright 2020 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this
+# file except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS
+# OF ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+# author Alok Ranjan (alok.ranjan2@hpe.com)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+author:
+  - HPE Nimble Storage Ansible Team (@ar-india) <nimble-dcs-storage-automation-eng@hpe.com>
+name: nimble_profile
+type: aggregate
+short_description: Profile the NimOS REST calls of the hpe.nimble tasks of a run
+description:
+  - Times every C(hpe.nimble) task and aggregates, for the whole run, the task count and the p50, p95 and p99 task duration of each module,
+    and the call count, p50, p95 and p99 latency and bytes transferred of each NimOS REST endpoint, together with the login count.
+  - The REST calls are taken from the C(debug_timing) block of the task results. The plugin turns I(debug_timing) on for the modules run on
+    the controller through the C(HPE_NIMBLE_DEBUG_TIMING) environment variable, see I(enable_debug_timing).
+  - Prints a summary table at the end of the run and optionally writes the aggregates to a JSON file.
+  - Enable it by adding C(hpe.nimble.nimble_profile) to C(callbacks_enabled) in the C([defaults]) section of C(ansible.cfg).
+version_added: "1.2.0"
+requirements:
+  - enable in configuration
+options:
+  output_path:
+    description:
+      - File the aggregates are written to as JSON. No file is written when not set.
+    type: path
+    env:
+      - name: HPE_NIMBLE_PROFILE_OUTPUT
+    ini:
+      - section: callback_nimble_profile
+        key: output_path
+  enable_debug_timing:
+    description:
+      - Turn on I(debug_timing) for the C(hpe.nimble) modules by exporting C(HPE_NIMBLE_DEBUG_TIMING). Without it only the task durations
+        are profiled, unless the tasks set I(debug_timing) themselves.
+    type: bool
+    default: True
+    env:
+      - name: HPE_NIMBLE_PROFILE_DEBUG_TIMING
+    ini:
+      - section: callback_nimble_profile
+        key: enable_debug_timing
+'''
+
+import json
+import math
+import os
+import re
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+# task actions of the collection, whether given with the collection prefix or not
+NIMBLE_ACTION = re.compile(r'^(hpe\.nimble\.)?(hpe_nimble_\w+)$')
+# NimOS object ids are 42 hex digits, they are folded so that the calls of an endpoint are aggregated together
+NIMOS_ID = re.compile(r'/[0-9a-f]{42}(?=/|$)')
+
+
+def percentile(values, pct):
+    # nearest-rank percentile of the values
+    if values.__len__() == 0:
+        return None
+    ordered = sorted(values)
+    return ordered[max(int(math.ceil(pct / 100.0 * ordered.__len__())) - 1, 0)]
+
+
+def summarize(values):
+    return {
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'total': round(sum(values), 6)
+    }
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'hpe.nimble.nimble_profile'
+    CALLBACK_NEEDS_WHITELIST = True
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self.output_path = None
+        self._task_start = {}
+        self._modules = {}
+        self._endpoints = {}
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        self.output_path = self.get_option('output_path')
+        if self.get_option('enable_debug_timing') is True:
+            # the modules run on the controller inherit the environment of the worker processes
+            os.environ.setdefault('HPE_NIMBLE_DEBUG_TIMING', 'true')
+
+    def _module_name(self, task):
+        action = getattr(task, 'resolved_action', None) or task.action
+        match = NIMBLE_ACTION.match(action or "")
+        return match.group(2) if match is not None else None
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task_start[task._uuid] = time.time()
+
+    def v2_runner_on_start(self, host, task):
+        self._task_start[(task._uuid, host.get_name())] = time.time()
+
+    def _record(self, result, failed=False):
+        module_name = self._module_name(result._task)
+        if module_name is None:
+            return
+        task_uuid = result._task._uuid
+        start = self._task_start.pop((task_uuid, result._host.get_name()), self._task_start.get(task_uuid))
+        module_stats = self._modules.setdefault(module_name, {
+            'tasks': 0, 'failed': 0, 'durations': [], 'api_calls': 0, 'logins': 0, 'bytes_sent': 0, 'bytes_received': 0
+        })
+        module_stats['tasks'] += 1
+        if failed is True:
+            module_stats['failed'] += 1
+        if start is not None:
+            module_stats['durations'].append(time.time() - start)
+
+        # a task with a loop carries the result of each item
+        for item_result in result._result.get('results', [result._result]):
+            timing = item_result.get('debug_timing') if isinstance(item_result, dict) else None
+            if not isinstance(timing, dict):
+                continue
+            module_stats['api_calls'] += timing.get('api_calls', 0)
+            module_stats['logins'] += timing.get('logins', 0)
+            module_stats['bytes_sent'] += timing.get('bytes_sent', 0)
+            module_stats['bytes_received'] += timing.get('bytes_received', 0)
+            for call in timing.get('calls', []):
+                key = f"{call.get('method')} {NIMOS_ID.sub('/{id}', call.get('endpoint') or '')}"
+                endpoint_stats = self._endpoints.setdefault(key, {'calls': 0, 'errors': 0, 'latencies': [], 'bytes_sent': 0, 'bytes_received': 0})
+                endpoint_stats['calls'] += 1
+                if call.get('status') is None or call.get('status') >= 400:
+                    endpoint_stats['errors'] += 1
+                endpoint_stats['latencies'].append(call.get('latency', 0))
+                endpoint_stats['bytes_sent'] += call.get('bytes_sent', 0)
+                endpoint_stats['bytes_received'] += call.get('bytes_received', 0)
+
+    def v2_runner_on_ok(self, result):
+        self._record(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, failed=True)
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, failed=True)
+
+    def report(self):
+        modules = {}
+        for name, stats in self._modules.items():
+            modules[name] = dict((key, value) for key, value in stats.items() if key != 'durations')
+            modules[name]['duration'] = summarize(stats['durations'])
+        endpoints = {}
+        for name, stats in self._endpoints.items():
+            endpoints[name] = dict((key, value) for key, value in stats.items() if key != 'latencies')
+            endpoints[name]['latency'] = summarize(stats['latencies'])
+        return {'modules': modules, 'endpoints': endpoints}
+
+    def _display_table(self, title, header, rows):
+        self._display.banner(title)
+        widths = [max([len(str(row[index])) for row in rows] + [len(header[index])]) for index in range(len(header))]
+        line = "  ".join(f"{{:<{width}}}" if index == 0 else f"{{:>{width}}}" for index, width in enumerate(widths))
+        self._display.display(line.format(*header))
+        for row in rows:
+            self._display.display(line.format(*row))
+
+    def v2_playbook_on_stats(self, stats):
+        if self._modules.__len__() == 0:
+            return
+        report = self.report()
+
+        def seconds(value):
+            return f"{value:.3f}" if value is not None else "-"
+
+        rows = []
+        for name, module_stats in sorted(report['modules'].items(), key=lambda item: -item[1]['duration']['total']):
+            duration = module_stats['duration']
+            rows.append((name, module_stats['tasks'], module_stats['failed'], seconds(duration['total']), seconds(duration['p50']),
+                         seconds(duration['p95']), seconds(duration['p99']), module_stats['api_calls'], module_stats['logins'],
+                         module_stats['bytes_sent'] + module_stats['bytes_received']))
+        self._display_table("HPE NIMBLE PROFILE: MODULES",
+                            ("module", "tasks", "failed", "total s", "p50 s", "p95 s", "p99 s", "calls", "logins", "bytes"), rows)
+
+        if report['endpoints'].__len__() > 0:
+            rows = []
+            for name, endpoint_stats in sorted(report['endpoints'].items(), key=lambda item: -item[1]['latency']['total']):
+                latency = endpoint_stats['latency']
+                rows.append((name, endpoint_stats['calls'], endpoint_stats['errors'], seconds(latency['total']), seconds(latency['p50']),
+                             seconds(latency['p95']), seconds(latency['p99']), endpoint_stats['bytes_sent'] + endpoint_stats['bytes_received']))
+            self._display_table("HPE NIMBLE PROFILE: REST ENDPOINTS",
+                                ("endpoint", "calls", "errors", "total s", "p50 s", "p95 s", "p99 s", "bytes"), rows)
+
+        if self.output_path is not None:
+            try:
+                with open(self.output_path, 'w') as output_file:
+                    json.dump(report, output_file, indent=2, sort_keys=True)
+            except (IOError, OSError) as ex:
+                self._display.warning(f"Could not write the HPE Nimble profile to '{self.output_path}': {ex}")
@@ -29,18 +29,53 @@ options:
   host:
     description:
     - HPE Nimble Storage IP address.
-    required: True
+    - Required unless the task runs over the C(hpe.nimble.nimble) httpapi connection plugin.
+    required: False
     type: str
   password:
     description:
     - HPE Nimble Storage password.
-    required: True
+    - Required unless the task runs over the C(hpe.nimble.nimble) httpapi connection plugin.
+    required: False
     type: str
   username:
     description:
     - HPE Nimble Storage user name.
-    required: True
+    - Required unless the task runs over the C(hpe.nimble.nimble) httpapi connection plugin.
+    required: False
     type: str
+  session_cache:
+    description:
+    - Reuse the NimOS session token of an earlier task for the same host and user instead of logging in again.
+    - Tokens are kept in a file readable only by the current user, see I(session_cache_path).
+    - If not set, the value of the C(HPE_NIMBLE_SESSION_CACHE) environment variable is used, so that all the tasks of a play can opt in at once.
+    required: False
+    type: bool
+    default: False
+  session_cache_path:
+    description:
+    - Path of the file holding the cached session tokens. Defaults to C(~/.ansible/tmp/hpe_nimble_session_cache.json).
+    - If not set, the value of the C(HPE_NIMBLE_SESSION_CACHE_PATH) environment variable is used.
+    required: False
+    type: path
+  session_cache_ttl:
+    description:
+    - Number of seconds a cached session token is reused for. A token rejected by the array is dropped from the cache sooner.
+    - If not set, the value of the C(HPE_NIMBLE_SESSION_CACHE_TTL) environment variable is used.
+    required: False
+    type: int
+    default: 1500
+  debug_timing:
+    description:
+    - Add a C(debug_timing) dictionary to the result of the task, describing the NimOS REST requests the task made.
+    - C(calls) lists every request in the order made, each with its C(method), C(endpoint), C(status), C(latency) in seconds, C(bytes_sent)
+      and C(bytes_received). C(api_calls) is the number of requests and C(api_time) the seconds spent in them, C(logins) the number of logins
+      and C(login_time) the seconds spent logging in, C(bytes_sent) and C(bytes_received) the sizes of all the request and response bodies.
+    - Over the C(hpe.nimble.nimble) httpapi connection plugin the login is done by the connection and is not part of the block.
+    - If not set, the value of the C(HPE_NIMBLE_DEBUG_TIMING) environment variable is used.
+    required: False
+    type: bool
+    default: False
 requirements:
   - Ansible 2.9 or later
   - Python 3.6 or later
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+# Copyright 2020 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this
+# file except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS
+# OF ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+# author Alok Ranjan (alok.ranjan2@hpe.com)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+author:
+  - HPE Nimble Storage Ansible Team (@ar-india) <nimble-dcs-storage-automation-eng@hpe.com>
+name: nimble
+short_description: HttpApi plugin for HPE Nimble Storage arrays
+description:
+  - This HttpApi plugin keeps one authenticated NimOS REST session per play, held by C(ansible-connection).
+  - All the C(hpe.nimble) modules of the play send their REST calls over that session instead of logging in on their own.
+    The I(host), I(username) and I(password) module options are not needed in that case.
+  - Use it with C(ansible_connection=ansible.netcommon.httpapi), C(ansible_network_os=hpe.nimble.nimble),
+    C(ansible_httpapi_port=5392) and C(ansible_httpapi_use_ssl=true).
+version_added: "1.2.0"
+'''
+
+import json
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.connection import ConnectionError
+from ansible.errors import AnsibleAuthenticationFailure
+from ansible.plugins.httpapi import HttpApiBase
+from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
+
+BASE_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+
+class HttpApi(HttpApiBase):
+
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._session_id = None
+
+    def login(self, username, password):
+        payload = {
+            'data': {
+                'username': username,
+                'password': password,
+                'app_name': f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
+            }
+        }
+        code, response = self.send_request(payload, path='/v1/tokens', method='POST')
+        session = response.get('data') if isinstance(response, dict) else None
+        if code >= 400 or not isinstance(session, dict) or 'session_token' not in session:
+            raise AnsibleAuthenticationFailure(f"Failed to log in to NimOS. Error: '{response}'")
+        self._session_id = session.get('id')
+        self.connection._auth = {'X-Auth-Token': str(session['session_token'])}
+
+    def logout(self):
+        if self._session_id is not None and self.connection._auth is not None:
+            self.send_request(None, path=f"/v1/tokens/{self._session_id}", method='DELETE')
+        self._session_id = None
+        self.connection._auth = None
+
+    def update_auth(self, response, response_text):
+        # NimOS does not rotate the session token, keep the one returned at login
+        return None
+
+    def handle_httperror(self, exc):
+        if exc.code == 401 and self.connection._auth is not None:
+            # the session expired on the array, log in again and resend the request
+            self.connection._auth = None
+            self.login(self.connection.get_option('remote_user'), self.connection.get_option('password'))
+            return True
+        # hand the error response back to the module, it carries the NimOS error messages
+        return exc
+
+    def send_request(self, data, path, method='GET'):
+        if data is not None:
+            data = json.dumps(data)
+        self.connection.queue_message('vvvv', f"NimOS REST request: {method} {path}")
+        response, response_data = self.connection.send(path, data, method=method, headers=BASE_HEADERS)
+        return response.getcode(), self._response_to_json(to_text(response_data.getvalue()))
+
+    def _response_to_json(self, response_text):
+        try:
+            return json.loads(response_text) if response_text else {}
+        except ValueError:
+            raise ConnectionError(f"Invalid JSON response: {response_text}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+
+# Copyright 2020 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this
+# file except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS
+# OF ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+# author Alok Ranjan (alok.ranjan2@hpe.com)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+author:
+  - HPE Nimble Storage Ansible Team (@ar-india) <nimble-dcs-storage-automation-eng@hpe.com>
+name: nimble
+short_description: Build an inventory from the objects of HPE Nimble Storage groups
+description:
+  - Reads the arrays, pools, volumes and initiator groups of one or more HPE Nimble Storage groups and adds each of them as an inventory host
+    named after I(hostname_format), by default C(<object type>_<object name>@<group name>) such as C(volume_vol1@group1), so that objects
+    of different types with the same name are different hosts.
+  - Every host gets the attributes read from the array as variables prefixed with C(nimble_), together with C(nimble_type), C(nimble_group)
+    and C(nimble_host), the management address to run the C(hpe.nimble) modules against.
+  - The hosts are put in the groups C(nimble_arrays), C(nimble_pools), C(nimble_volumes) and C(nimble_initiator_groups), in one group per
+    Nimble group, C(nimble_group_<group name>), and the volumes in one group per pool, C(nimble_pool_<pool name>).
+  - All the objects of all the groups are read concurrently, and only the attributes in I(fields) are asked for.
+  - The configuration file name must end with C(nimble.yml) or C(nimble.yaml).
+version_added: "1.2.0"
+extends_documentation_fragment:
+  - constructed
+  - inventory_cache
+options:
+  plugin:
+    description: Token that ensures this is a source file for the plugin.
+    required: True
+    type: str
+    choices: ['hpe.nimble.nimble']
+  hosts:
+    description:
+      - Management addresses of the Nimble groups to read. An entry can also be a dictionary with the keys C(host), C(username) and
+        C(password), to use other credentials than I(username) and I(password) for that group.
+    required: True
+    type: list
+    elements: raw
+  username:
+    description:
+      - HPE Nimble Storage user name.
+    type: str
+    env:
+      - name: HPE_NIMBLE_USERNAME
+  password:
+    description:
+      - HPE Nimble Storage password.
+    type: str
+    env:
+      - name: HPE_NIMBLE_PASSWORD
+  objects:
+    description:
+      - Object types added to the inventory.
+    type: list
+    elements: str
+    default: ['arrays', 'pools', 'volumes', 'initiator_groups']
+  fields:
+    description:
+      - Attributes read for each object type, as a dictionary of object type to list of attribute names. Replaces the default list of
+        that object type. The attributes C(id) and C(name) are always read.
+    type: dict
+    default: {}
+  max_workers:
+    description:
+      - Maximum number of object types read from the groups at the same time.
+    type: int
+    default: 4
+  session_cache:
+    description:
+      - Reuse the cached NimOS session token of a group instead of logging in again, see the I(session_cache) option of the modules.
+    type: bool
+    default: False
+  hostname_format:
+    description:
+      - Name of the inventory host of an object. C({type}) is replaced with the object type, one of C(array), C(pool), C(volume) and
+        C(initiator_group), C({name}) with the object name and C({group}) with the name of its Nimble group.
+      - A format without C({type}) makes objects of different types with the same name a single host.
+    type: str
+    default: "{type}_{name}@{group}"
+'''
+
+EXAMPLES = r'''
+# nimble.yml
+plugin: hpe.nimble.nimble
+hosts:
+  - 192.168.1.10
+  - host: 192.168.2.10
+    username: admin
+    password: secret2
+username: admin
+password: secret
+objects:
+  - volumes
+  - initiator_groups
+fields:
+  volumes: ['size', 'pool_name', 'online', 'volcoll_name']
+keyed_groups:
+  - key: nimble_volcoll_name
+    prefix: volcoll
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: /tmp/nimble_inventory
+cache_timeout: 600
+'''
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.errors import AnsibleError, AnsibleParserError
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
+try:
+    from nimbleclient.v1 import client
+except ImportError:
+    client = None
+import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
+
+# attributes read for each object type unless the fields option says otherwise
+DEFAULT_FIELDS = {
+    "arrays": ["id", "name", "full_name", "serial", "model", "extended_model", "version", "role", "status", "all_flash"],
+    "pools": ["id", "name", "capacity", "free_space", "usage", "array_count", "is_default"],
+    "volumes": ["id", "name", "size", "pool_name", "perfpolicy_name", "online", "vol_state", "volcoll_name", "num_snaps", "target_name",
+                "serial_number", "description"],
+    "initiator_groups": ["id", "name", "access_protocol", "description", "iscsi_initiators", "fc_initiators"]
+}
+
+# the inventory group each object type is put in
+TYPE_GROUPS = {
+    "arrays": ("array", "nimble_arrays"),
+    "pools": ("pool", "nimble_pools"),
+    "volumes": ("volume", "nimble_volumes"),
+    "initiator_groups": ("initiator_group", "nimble_initiator_groups")
+}
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = 'hpe.nimble.nimble'
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(('nimble.yml', 'nimble.yaml'))
+        return False
+
+    def _get_client(self, host, username, password):
+        app_name = f"HPE Nimble Ansible Inventory v{utils.__version__}"
+        if self.get_option('session_cache') is True and utils.SessionManager is not None:
+            try:
+                return utils.NimOSSessionCache().get_client(host, username, password, app_name)
+            except (IOError, OSError):
+                pass
+        return client.NimOSClient(host, username, password, app_name)
+
+    def _group_sources(self):
+        sources = []
+        for entry in self.get_option('hosts'):
+            if isinstance(entry, dict):
+                source = {
+                    'host': entry.get('host'),
+                    'username': entry.get('username', self.get_option('username')),
+                    'password': entry.get('password', self.get_option('password'))
+                }
+            else:
+                source = {'host': entry, 'username': self.get_option('username'), 'password': self.get_option('password')}
+            if utils.is_null_or_empty(source['host']) or utils.is_null_or_empty(source['username']) or utils.is_null_or_empty(source['password']):
+                raise AnsibleParserError(f"Each entry of 'hosts' needs a host, a username and a password. Invalid entry for host '{source['host']}'.")
+            sources.append(source)
+        return sources
+
+    def _read_objects(self, info_subset, object_type):
+        fields = self.get_option('fields').get(object_type) or DEFAULT_FIELDS[object_type]
+        fields = ",".join(["id", "name"] + [field for field in fields if field not in ("id", "name")])
+        return [obj.attrs for obj in utils.iter_list(info_subset[object_type], detail=True, fields=fields)]
+
+    def _fetch(self):
+        objects = self.get_option('objects')
+        invalid = [object_type for object_type in objects if object_type not in TYPE_GROUPS]
+        if invalid.__len__() > 0:
+            raise AnsibleParserError(f"Invalid object type(s) '{', '.join(invalid)}'. Valid object types are: {', '.join(TYPE_GROUPS)}.")
+
+        sources = self._group_sources()
+        executor = ThreadPoolExecutor(max_workers=max(self.get_option('max_workers'), 1))
+        try:
+            # log in to every group at once, then read every object type of every group at once
+            info_subsets = list(executor.map(lambda source: utils.intialize_info_subset(self._get_client(source['host'], source['username'],
+                                                                                                         source['password'])), sources))
+            group_names = executor.map(lambda info_subset: info_subset['groups'].list(detail=True, fields="name")[0].attrs.get('name'),
+                                       info_subsets)
+            futures = [(source, object_type, executor.submit(self._read_objects, info_subset, object_type))
+                       for source, info_subset in zip(sources, info_subsets) for object_type in objects]
+            results = {}
+            for source, group_name in zip(sources, group_names):
+                results[source['host']] = {'group_name': group_name, 'objects': {}}
+            for source, object_type, future in futures:
+                results[source['host']]['objects'][object_type] = future.result()
+            return results
+        except AnsibleError:
+            raise
+        except Exception as ex:
+            raise AnsibleError(f"Failed to read the HPE Nimble Storage objects. Error: '{ex}'")
+        finally:
+            executor.shutdown(wait=True)
+
+    def _populate(self, results):
+        strict = self.get_option('strict')
+        for type_group in TYPE_GROUPS.values():
+            self.inventory.add_group(type_group[1])
+        for host, result in results.items():
+            group_name = result['group_name']
+            nimble_group = self.inventory.add_group(f"nimble_group_{self._sanitize(group_name)}")
+            for object_type, records in result['objects'].items():
+                type_name, type_group = TYPE_GROUPS[object_type]
+                for record in records:
+                    hostname = self.inventory.add_host(self.get_option('hostname_format').format(type=type_name, name=record.get('name'),
+                                                                                                 group=group_name), group=type_group)
+                    self.inventory.add_child(nimble_group, hostname)
+                    hostvars = dict((f"nimble_{key}", value) for key, value in record.items())
+                    hostvars.update(nimble_type=type_name, nimble_group=group_name, nimble_host=host)
+                    for key, value in hostvars.items():
+                        self.inventory.set_variable(hostname, key, value)
+                    if object_type == "volumes" and record.get('pool_name') is not None:
+                        self.inventory.add_child(self.inventory.add_group(f"nimble_pool_{self._sanitize(record['pool_name'])}"), hostname)
+                    self._set_composite_vars(self.get_option('compose'), hostvars, hostname, strict=strict)
+                    self._add_host_to_composed_groups(self.get_option('groups'), hostvars, hostname, strict=strict)
+                    self._add_host_to_keyed_groups(self.get_option('keyed_groups'), hostvars, hostname, strict=strict)
+
+    @staticmethod
+    def _sanitize(name):
+        return re.sub(r'[^A-Za-z0-9_]', '_', str(name))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        if client is None:
+            raise AnsibleError("Python nimble-sdk could not be found.")
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+        results = None
+        if attempt_to_read_cache:
+            try:
+                results = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+        if results is None:
+            results = self._fetch()
+        if cache_needs_update:
+            self._cache[cache_key] = results
+        self._populate(results)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+
+# Copyright 2020 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this
+# file except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS
+# OF ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+# author Alok Ranjan (alok.ranjan2@hpe.com)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+author:
+  - HPE Nimble Storage Ansible Team (@ar-india) <nimble-dcs-storage-automation-eng@hpe.com>
+name: nimble_lookup
+short_description: Resolve HPE Nimble Storage objects by name
+description:
+  - Looks up objects of a NimOS object set, such as C(volumes) or C(initiator_groups), by name.
+  - All the names of one object set are resolved with a single listing of that object set, reading only C(id), C(name) and the attributes in
+    I(fields). With I(cache_ttl) set, the listing is cached on disk for that many seconds, so the lookups of the following tasks do not go to
+    the array again. A name missing from a cached listing, such as the one of an object created earlier in the play, makes the object set be
+    listed again, but an object deleted and created again or renamed within I(cache_ttl) resolves to its old id.
+  - Without I(fields) the ids of the objects are returned, in the order of I(names). With I(fields) a dictionary holding the name and the
+    requested attributes is returned for each object.
+version_added: "1.2.0"
+options:
+  _terms:
+    description:
+      - Object sets to look up, for example C(volumes), C(initiator_groups), C(volume_collections) or C(pools).
+    required: True
+    type: list
+    elements: str
+  names:
+    description:
+      - Names of the objects to return, looked up in each object set of the terms. All the objects are returned when not given.
+    type: list
+    elements: str
+  fields:
+    description:
+      - Attributes to return for each object. Only the ids are returned when not given.
+    type: list
+    elements: str
+  missing:
+    description:
+      - What to do with a name that does not exist. C(error) fails the lookup, C(skip) leaves it out and C(none) returns null in its place.
+    type: str
+    default: error
+    choices: ['error', 'skip', 'none']
+  host:
+    description:
+      - HPE Nimble Storage IP address. Taken from the C(nimble_host) variable set by the C(hpe.nimble.nimble) inventory plugin when not given.
+    type: str
+    env:
+      - name: HPE_NIMBLE_HOST
+    vars:
+      - name: nimble_host
+  username:
+    description:
+      - HPE Nimble Storage user name.
+    type: str
+    env:
+      - name: HPE_NIMBLE_USERNAME
+    vars:
+      - name: nimble_username
+  password:
+    description:
+      - HPE Nimble Storage password.
+    type: str
+    env:
+      - name: HPE_NIMBLE_PASSWORD
+    vars:
+      - name: nimble_password
+  cache_ttl:
+    description:
+      - Number of seconds a listing is reused for, 0 reads the array on every lookup.
+      - Keep it short, and at 0 for the lookups feeding tasks which delete or overwrite, as a cached id can be stale.
+    type: int
+    default: 0
+    env:
+      - name: HPE_NIMBLE_LOOKUP_CACHE_TTL
+  cache_path:
+    description:
+      - Directory holding the cached listings.
+    type: path
+    default: ~/.ansible/tmp/hpe_nimble_lookup
+    env:
+      - name: HPE_NIMBLE_LOOKUP_CACHE_PATH
+  session_cache:
+    description:
+      - Reuse the cached NimOS session token of the group instead of logging in again, see the I(session_cache) option of the modules.
+    type: bool
+    default: False
+    env:
+      - name: HPE_NIMBLE_LOOKUP_SESSION_CACHE
+'''
+
+EXAMPLES = r'''
+- name: Resolve the ids of some volumes
+  ansible.builtin.debug:
+    msg: "{{ lookup('hpe.nimble.nimble_lookup', 'volumes', names=['vol1', 'vol2'], host=host, username=username, password=password) }}"
+
+- name: Read the size of the volumes and the protocol of the initiator groups
+  ansible.builtin.set_fact:
+    volumes: "{{ query('hpe.nimble.nimble_lookup', 'volumes', names=volume_names, fields=['id', 'size']) }}"
+    initiator_groups: "{{ query('hpe.nimble.nimble_lookup', 'initiator_groups', fields=['access_protocol']) }}"
+'''
+
+RETURN = r'''
+_raw:
+  description:
+    - The ids of the objects, or a dictionary with the name and the requested attributes of each object when I(fields) is given.
+  type: list
+  elements: raw
+'''
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+try:
+    from nimbleclient.v1 import client
+except ImportError:
+    client = None
+import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
+
+# listings already read by this process, keyed like the cache files
+_listings = {}
+_listings_lock = threading.Lock()
+
+
+class LookupModule(LookupBase):
+
+    def _cache_file(self, key):
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(os.path.expanduser(self.get_option('cache_path')), f"hpe_nimble_lookup_{digest}.json")
+
+    def _load(self, key, ttl):
+        with _listings_lock:
+            entry = _listings.get(json.dumps(key, sort_keys=True))
+        if entry is None and ttl > 0:
+            try:
+                with open(self._cache_file(key), 'r') as cache_file:
+                    entry = json.load(cache_file)
+            except (IOError, OSError, ValueError):
+                entry = None
+        if not isinstance(entry, dict) or time.time() - entry.get('created', 0) > ttl:
+            return None
+        return entry.get('objects')
+
+    def _store(self, key, objects, ttl):
+        entry = {'created': time.time(), 'objects': objects}
+        with _listings_lock:
+            _listings[json.dumps(key, sort_keys=True)] = entry
+        if ttl <= 0:
+            return
+        path = self._cache_file(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(entry, cache_file, separators=(',', ':'))
+            os.replace(temp_path, path)
+        except (IOError, OSError, TypeError, ValueError):
+            # a cache that cannot be written must not fail the lookup
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _get_client(self, host, username, password):
+        app_name = f"HPE Nimble Ansible Lookup v{utils.__version__}"
+        if self.get_option('session_cache') is True and utils.SessionManager is not None:
+            try:
+                return utils.NimOSSessionCache().get_client(host, username, password, app_name)
+            except (IOError, OSError):
+                pass
+        return client.NimOSClient(host, username, password, app_name)
+
+    def run(self, terms, variables=None, **kwargs):
+        if client is None:
+            raise AnsibleError("Python nimble-sdk could not be found.")
+        self.set_options(var_options=variables, direct=kwargs)
+        host = self.get_option('host')
+        username = self.get_option('username')
+        password = self.get_option('password')
+        if utils.is_null_or_empty(host) or utils.is_null_or_empty(username) or utils.is_null_or_empty(password):
+            raise AnsibleError("Missing variables: host, username and password is mandatory.")
+        names = self.get_option('names')
+        fields = self.get_option('fields')
+        missing = self.get_option('missing')
+        ttl = self.get_option('cache_ttl')
+        fields_to_read = ["id", "name"] + sorted(set(fields or []) - set(["id", "name"]))
+
+        client_obj = None
+        ret = []
+        for term in terms:
+            key = [host, username, term, fields_to_read]
+            objects = self._load(key, ttl)
+            cached = objects is not None
+            if cached is True and names is not None:
+                # the cached listing may predate an object created since, hence a missing name is looked for on the array
+                listed_names = set(obj.get('name') for obj in objects)
+                cached = all(name in listed_names for name in names)
+            if cached is False:
+                if client_obj is None:
+                    client_obj = self._get_client(host, username, password)
+                collection = getattr(client_obj, term, None)
+                if collection is None or not hasattr(collection, 'list'):
+                    raise AnsibleError(f"Invalid NimOS object set '{term}'.")
+                try:
+                    # one listing of the object set answers all the names asked for
+                    objects = [obj.attrs for obj in utils.iter_list(collection, detail=True, fields=",".join(fields_to_read))]
+                except Exception as ex:
+                    raise AnsibleError(f"Failed to list the NimOS object set '{term}'. Error: '{ex}'")
+                self._store(key, objects, ttl)
+
+            by_name = dict((obj.get('name'), obj) for obj in objects)
+            for name in (names if names is not None else [obj.get('name') for obj in objects]):
+                obj = by_name.get(name)
+                if obj is None:
+                    if missing == 'error':
+                        raise AnsibleError(f"Object '{name}' not found in '{term}'.")
+                    if missing == 'none':
+                        ret.append(None)
+                    continue
+                if fields is None:
+                    ret.append(obj.get('id'))
+                else:
+                    ret.append(dict((field, obj.get(field)) for field in ["name"] + [field for field in fields if field != "name"]))
+        return ret
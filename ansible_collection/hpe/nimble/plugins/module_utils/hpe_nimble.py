@@ -17,11 +17,44 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import collections
 import datetime
+import fcntl
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+import time
+import types
 import uuid
+import weakref
+from ansible.module_utils.basic import env_fallback
+from ansible.module_utils.connection import Connection
+from ansible.module_utils.six.moves.urllib.parse import urlencode, urlsplit
+try:
+    from nimbleclient.v1 import client
+    from nimbleclient.v1 import restclient
+    from nimbleclient.v1.client import NimOSClient
+    from nimbleclient.v1.restclient import NimOSAPIClient
+    from nimbleclient import exceptions
+except ImportError:
+    client = restclient = None
+    NimOSClient = NimOSAPIClient = object
+try:
+    from nimbleclient.v1.restclient import SessionManager
+except ImportError:
+    SessionManager = None
 
 __version__ = "1.1.0"
 
+# number of objects asked for in one page when a collection is read page by page
+DEFAULT_PAGE_SIZE = 1000
+# NimOS drops idle sessions after 30 minutes by default, hence keep the cached token lifetime below that.
+DEFAULT_SESSION_CACHE_TTL = 1500
+DEFAULT_SESSION_CACHE_PATH = os.path.join("~", ".ansible", "tmp", "hpe_nimble_session_cache.json")
+
 
 def is_null_or_empty(name):
     if type(name) is bool:
@@ -50,19 +83,87 @@ def remove_null_args(**kwargs):
     return kwargs
 
 
-def is_dict_item_present_on_server(server_list_of_dict, dict_to_check):
+# hashable form of a value that does not depend on the order of lists: a dict becomes the frozenset of its items
+# and a list the frozenset of its (item, count) pairs, so two lists holding the same items in any order are equal
+def freeze_value(value):
+    if isinstance(value, dict):
+        return frozenset((key, freeze_value(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return frozenset(collections.Counter(freeze_value(item) for item in value).items())
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze_value(item) for item in value)
+    return value
 
-    if dict_to_check is None and server_list_of_dict is None:
-        return True
-    if len(dict_to_check) == 0:
-        return False
-    if type(server_list_of_dict) is not list:
-        return False
 
-    for server_dict in server_list_of_dict:
-        if (dict_to_check.items() <= server_dict.items()) is True:
-            return True
-    return False
+# true if every key of dict_to_check is present in server_dict with the same value. nested dicts are compared the same way
+def is_dict_subset(dict_to_check, server_dict):
+    for key, value in dict_to_check.items():
+        if key not in server_dict:
+            return False
+        server_value = server_dict[key]
+        if type(value) is dict and type(server_value) is dict:
+            if is_dict_subset(value, server_value) is False:
+                return False
+        elif freeze_value(value) != freeze_value(server_value):
+            return False
+    return True
+
+
+# compare two lists as multisets. a dict item matches a server dict holding the same values for its keys,
+# so the user does not have to give every attribute the server returns. each server item is matched once.
+def diff_list(server_list, value_list):
+    server_list = server_list if type(server_list) is list else []
+    server_index = {}
+    matched = set()
+    added = []
+    for item in value_list:
+        keys = frozenset(item) if type(item) is dict else None
+        if keys not in server_index:
+            # index the server items by their projection on the keys of this kind of item, once per kind
+            index = server_index[keys] = {}
+            for position in range(server_list.__len__() - 1, -1, -1):
+                entry = server_list[position]
+                if keys is None and type(entry) is not dict:
+                    index.setdefault(freeze_value(entry), []).append(position)
+                elif keys is not None and type(entry) is dict and keys <= entry.keys():
+                    index.setdefault(freeze_value(dict((key, entry[key]) for key in keys)), []).append(position)
+        candidates = server_index[keys].get(freeze_value(item), [])
+        while candidates.__len__() > 0 and candidates[-1] in matched:
+            candidates.pop()
+        if candidates.__len__() > 0:
+            matched.add(candidates.pop())
+        else:
+            added.append(item)
+    removed = [entry for position, entry in enumerate(server_list) if position not in matched]
+    return (added, removed)
+
+
+# structured difference between the value of an attribute on the server and the value asked for, None if unchanged.
+# every diff has "before" and "after", list diffs also have the "added" and "removed" items and dict diffs the "changed" keys
+def diff_value(server_value, value):
+    if type(value) is dict and type(server_value) in (dict, list):
+        if type(server_value) is list:
+            # metadata is given as a dict but the server returns it as a list of key/value dicts
+            server_value = dict((entry.get('key'), entry.get('value')) for entry in server_value if type(entry) is dict and 'key' in entry)
+        if is_dict_subset(value, server_value) is True:
+            return None
+        changed = {}
+        for key, item in value.items():
+            if key not in server_value or is_dict_subset({key: item}, server_value) is False:
+                changed[key] = {"before": server_value.get(key), "after": item}
+        return {"before": server_value, "after": value, "changed": changed}
+
+    if type(value) is list and (type(server_value) is list or server_value is None):
+        added, removed = diff_list(server_value, value)
+        if added.__len__() == 0 and removed.__len__() == 0:
+            return None
+        return {"before": server_value, "after": value, "added": added, "removed": removed}
+
+    if type(value) is not type(server_value) and (type(value) in (dict, list) or type(server_value) in (dict, list)):
+        return {"before": server_value, "after": value}
+    if server_value != value:
+        return {"before": server_value, "after": value}
+    return None
 
 
 # remove unchanged item from kwargs by matching them with the data present in given object attrs
@@ -77,68 +178,21 @@ def remove_unchanged_or_null_args(server_resp, **kwargs):
     changed_attrs_dict = {}
 
     for key, value in params_to_search.items():
-        # there could be a possibility that a user provided a wrong "key" name which is not at all present
-        # in server resp.In that case get() will return None and hence will be added to list of changed_attrs.
         server_value = server_resp.attrs.get(key)
-
-        if type(server_value) is list and type(value) is dict:
-            if len(value) == 0:
-                continue
-            # we will land here if the user wants to update a metadata.
-            # server return a list of metadata dictionary
-            temp_server_metadata_dict = {}
-            for server_entry in server_value:
-                temp_server_metadata_dict[server_entry['key']] = server_entry['value']
-            if (value.items() <= temp_server_metadata_dict.items()) is False:
-                changed_attrs_dict[key] = value
-            else:
-                params.pop(key)
-
-        elif type(server_value) is dict and type(value) is dict:
-            if len(value) == 0:
-                continue
-            if (value.items() <= server_value.items()) is False:
-                changed_attrs_dict[key] = value
-            else:
-                params.pop(key)
-
-        elif type(server_value) is list and type(value) is list:
-            found_changed_list = False
-            if len(value) != len(server_value):
-                changed_attrs_dict[key] = value
-                continue
-            # check if the list has dictionary to compare
-            for entry_to_check in value:
-                if type(entry_to_check) is dict:
-                    if is_dict_item_present_on_server(server_value, entry_to_check) is True:
-                        continue
-                    # no need to further check for other keys as we already got one mismatch
-                    changed_attrs_dict[key] = value
-                    found_changed_list = True
-                else:
-                    if server_value.sort() != value.sort():
-                        changed_attrs_dict[key] = value
-                        found_changed_list = True
-                break
-            if found_changed_list is False:
-                params.pop(key)
-
-        elif server_value is None and type(value) is list:
+        if type(value) is dict and type(server_value) in (dict, list) and value.__len__() == 0:
+            continue
+        if server_value is None and type(value) is list and value.__len__() == 0:
             # this is a special case wherein the user has provided an empty list and
             # server already has null value for that list. in this case we should not add the
             # argument to changed_attrs_dict
-            if len(value) == 0:
-                # don't add empty list for update
-                continue
-            changed_attrs_dict[key] = value
-        elif server_value != value:
-            # This is a special key used to force any operation for object.
-            # So, that is never updated as a server attribute.
-            if key != "force":
-                changed_attrs_dict[key] = value
-        else:
+            continue
+        if diff_value(server_value, value) is None:
             # remove this from param from dictionary as value is same and already present on server
             params.pop(key)
+        elif key != "force":
+            # "force" is a special key used to force any operation for object.
+            # So, that is never updated as a server attribute.
+            changed_attrs_dict[key] = value
     return (changed_attrs_dict, params)
 
 
@@ -146,110 +200,983 @@ def basic_auth_arg_fields():
 
     fields = {
         "host": {
-            "required": True,
+            "required": False,
             "type": "str"
         },
         "username": {
-            "required": True,
+            "required": False,
             "type": "str"
         },
         "password": {
-            "required": True,
+            "required": False,
             "type": "str",
             "no_log": True
+        },
+        "session_cache": {
+            "required": False,
+            "type": "bool",
+            "default": False,
+            "fallback": (env_fallback, ['HPE_NIMBLE_SESSION_CACHE'])
+        },
+        "session_cache_path": {
+            "required": False,
+            "type": "path",
+            "fallback": (env_fallback, ['HPE_NIMBLE_SESSION_CACHE_PATH'])
+        },
+        "session_cache_ttl": {
+            "required": False,
+            "type": "int",
+            "default": DEFAULT_SESSION_CACHE_TTL,
+            "fallback": (env_fallback, ['HPE_NIMBLE_SESSION_CACHE_TTL'])
+        },
+        "debug_timing": {
+            "required": False,
+            "type": "bool",
+            "default": False,
+            "fallback": (env_fallback, ['HPE_NIMBLE_DEBUG_TIMING'])
         }
     }
     return fields
 
 
+class NimOSSessionCache(object):
+    """On-disk cache of NimOS session tokens keyed by host and user name.
+
+    The cache file is shared by every task, so all the reads and writes are done under an exclusive lock.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_SESSION_CACHE_TTL):
+        self.path = os.path.expanduser(path if path is not None else DEFAULT_SESSION_CACHE_PATH)
+        self.ttl = ttl
+
+    @staticmethod
+    def _entry_key(hostname, username):
+        return hashlib.sha256(f"{hostname}:{username}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _credential_digest(hostname, port, username, password):
+        # a token is only handed out when the caller knows the password it was obtained with
+        salt = f"{hostname}:{port}:{username}".encode('utf-8')
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 10000).hex()
+
+    def _locked(self):
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        return lock_fd
+
+    def _unlock(self, lock_fd):
+        fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        os.close(lock_fd)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as cache_file:
+                entries = json.load(cache_file)
+            return entries if isinstance(entries, dict) else {}
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        now = time.time()
+        entries = dict((key, value) for key, value in entries.items() if value.get('expires', 0) > now)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump(entries, cache_file)
+        os.replace(temp_path, self.path)
+
+    def load(self, hostname, port, username, password):
+        lock_fd = self._locked()
+        try:
+            entry = self._read().get(self._entry_key(hostname, username))
+        finally:
+            self._unlock(lock_fd)
+        if entry is None or entry.get('expires', 0) <= time.time():
+            return None
+        if entry.get('digest') != self._credential_digest(hostname, port, username, password):
+            return None
+        return (entry.get('session_id'), entry.get('session_token'))
+
+    def store(self, hostname, port, username, password, session_id, session_token):
+        try:
+            lock_fd = self._locked()
+        except (IOError, OSError):
+            # an unusable cache file must never fail the task
+            return False
+        try:
+            entries = self._read()
+            entries[self._entry_key(hostname, username)] = {
+                'digest': self._credential_digest(hostname, port, username, password),
+                'session_id': session_id,
+                'session_token': session_token,
+                'expires': time.time() + self.ttl
+            }
+            self._write(entries)
+            return True
+        except (IOError, OSError):
+            return False
+        finally:
+            self._unlock(lock_fd)
+
+    def invalidate(self, hostname, username):
+        try:
+            lock_fd = self._locked()
+        except (IOError, OSError):
+            return False
+        try:
+            entries = self._read()
+            if entries.pop(self._entry_key(hostname, username), None) is not None:
+                self._write(entries)
+            return True
+        except (IOError, OSError):
+            return False
+        finally:
+            self._unlock(lock_fd)
+
+    def get_client(self, hostname, username, password, app_name, port=None, requests_module=None):
+        if port is None:
+            # the port the sdk client connects to when it is not given one
+            port = inspect.signature(client.NimOSClient.__init__).parameters['port'].default
+        cached = self.load(hostname, port, username, password)
+        if cached is not None and None not in cached:
+            # the sdk reuses a session found in its session manager instead of logging in again
+            connection_hash = str(uuid.uuid3(uuid.NAMESPACE_OID, f'{hostname}{port}{username}{password}'))
+            SessionManager._SESSIONS[connection_hash] = cached
+        client_obj = new_sdk_client(hostname, username, password, app_name, port, requests_module)
+        rest_client = client_obj._client
+        if cached is None or rest_client.session_token != cached[1]:
+            self.store(hostname, port, username, password, rest_client.session_id, rest_client.session_token)
+
+        sdk_connect = rest_client._connect
+        sdk_get = rest_client.get
+
+        def connect():
+            # the array rejected the cached token with a 401, drop it before logging in again
+            self.invalidate(hostname, username)
+            connected = sdk_connect()
+            self.store(hostname, port, username, password, rest_client.session_id, rest_client.session_token)
+            return connected
+
+        def get(endpoint, *args, **kwargs):
+            session_token = rest_client.session_token
+            try:
+                return sdk_get(endpoint, *args, **kwargs)
+            except Exception:
+                # the sdk logs in again on a 401 but still fails the GET, hence retry it once with the new token
+                if rest_client.session_token == session_token:
+                    raise
+                return sdk_get(endpoint, *args, **kwargs)
+
+        rest_client._connect = connect
+        rest_client.get = get
+        return client_obj
+
+
+class NimOSHttpApiRestClient(NimOSAPIClient):
+    """NimOS REST client sending every request over the persistent connection of the hpe.nimble.nimble httpapi plugin.
+
+    The login and the session token are owned by the connection plugin, hence only the transport of the sdk client is replaced.
+    """
+
+    def __init__(self, connection, job_timeout=60):
+        self._connection = connection
+        self.hostname = None
+        self.job_timeout = job_timeout
+        self.session_id = None
+        self.session_token = None
+        self.connected = True
+
+    def _send(self, method, endpoint, data=None, query=None):
+        path = f"/{endpoint}"
+        if query:
+            path = f"{path}?{'&'.join(query)}"
+        return self._connection.send_request(data, path=path, method=method)
+
+    def _handle_async_job(self, code, response, job_timeout):
+        if code >= 400:
+            raise exceptions.NimOSAPIError(response)
+        if code == 202 and 'messages' in response and response['messages'][0]['code'] == 'SM_async_job_id':
+            return self.job_handler(response['messages'][0]['arguments']['job_id'], job_timeout)
+        return response
+
+    def _refresh_connection(self):
+        # the connection plugin logs in again on its own when the array returns a 401
+        pass
+
+    def close_connection(self):
+        pass
+
+    def get(self, endpoint, filter=None, limit=None, from_id=None, **params):
+        query = []
+        if limit is not None:
+            query.append(f"pageSize={limit}")
+        if from_id is not None:
+            query.append(f"id%3E{from_id}")
+        response_data = []
+        while 1:
+            # like requests, leave out the parameters without a value
+            page_params = dict((key, value) for key, value in params.items() if value is not None)
+            page_query = query + ([urlencode(page_params)] if page_params else [])
+            if filter is not None:
+                code, response = self._send('POST', endpoint, filter, page_query)
+            else:
+                code, response = self._send('GET', endpoint, None, page_query)
+            if code >= 400 or 'messages' in response:
+                raise exceptions.NimOSAPIError(response.get('messages', response))
+            if 'totalRows' not in response:
+                return response
+
+            response_data.extend(response['data'])
+            # same paging rules as the sdk client
+            if limit is not None or len(response['data']) == 0 or response['endRow'] == response['totalRows']:
+                break
+            params['startRow'] = params.get('startRow', 0) + len(response['data'])
+        return response_data
+
+    def delete(self, endpoint, job_timeout=None):
+        code, response = self._send('DELETE', endpoint)
+        return self._handle_async_job(code, response, job_timeout)
+
+    def put(self, endpoint, job_timeout=None, **payload):
+        if 'metadata' in payload:
+            payload['metadata'] = [{'key': key, 'value': payload['metadata'][key]} for key in payload['metadata']]
+        code, response = self._send('PUT', endpoint, {'data': payload})
+        return self._handle_async_job(code, response, job_timeout)
+
+    def post(self, endpoint, job_timeout=None, **params):
+        if 'metadata' in params:
+            params['metadata'] = [{'key': key, 'value': params['metadata'][key]} for key in params['metadata']]
+        code, response = self._send('POST', endpoint, {'data': params})
+        return self._handle_async_job(code, response, job_timeout)
+
+
+class NimOSHttpApiClient(NimOSClient):
+    """NimOS client for tasks running over the hpe.nimble.nimble httpapi connection plugin."""
+
+    def __init__(self, connection):
+        self._client = NimOSHttpApiRestClient(connection)
+
+
+def has_httpapi_connection(module):
+    return getattr(module, '_socket_path', None) is not None
+
+
+def is_missing_credentials(module):
+    # host and credentials are owned by the connection plugin when the task runs over httpapi
+    if has_httpapi_connection(module):
+        return False
+    return module.params["host"] is None or module.params["username"] is None or module.params["password"] is None
+
+
+def get_host(module):
+    # the array address is an option of the connection plugin when the task runs over httpapi
+    if module.params["host"] is None and has_httpapi_connection(module):
+        return Connection(module._socket_path).get_option('host')
+    return module.params["host"]
+
+
+def get_username(module):
+    # as the array address, the user is an option of the connection plugin when the task runs over httpapi
+    if module.params["username"] is None and has_httpapi_connection(module):
+        return Connection(module._socket_path).get_option('remote_user')
+    return module.params["username"]
+
+
+class NimOSCallRecorder(object):
+    """Records every NimOS REST request a task makes and adds them to the result of the task as debug_timing."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def record(self, method, endpoint, status, latency, bytes_sent, bytes_received):
+        with self._lock:
+            self.calls.append({
+                'method': method,
+                'endpoint': endpoint,
+                'status': status,
+                'latency': round(latency, 6),
+                'bytes_sent': bytes_sent,
+                'bytes_received': bytes_received
+            })
+
+    def report(self):
+        with self._lock:
+            calls = list(self.calls)
+        logins = [call for call in calls if call['method'] == 'POST' and call['endpoint'] == 'v1/tokens']
+        return {
+            'calls': calls,
+            'api_calls': calls.__len__(),
+            'api_time': round(sum(call['latency'] for call in calls), 6),
+            'logins': logins.__len__(),
+            'login_time': round(sum(call['latency'] for call in logins), 6),
+            'bytes_sent': sum(call['bytes_sent'] for call in calls),
+            'bytes_received': sum(call['bytes_received'] for call in calls)
+        }
+
+    def instrument_httpapi(self, rest_client):
+        # the connection plugin logs in on its own, hence only the requests of the task are seen here
+        send = rest_client._send
+
+        def timed_send(method, endpoint, data=None, query=None):
+            start = time.time()
+            code = response = None
+            try:
+                code, response = send(method, endpoint, data, query)
+                return code, response
+            finally:
+                self.record(method, endpoint, code, time.time() - start,
+                            len(json.dumps(data)) if data is not None else 0,
+                            len(json.dumps(response)) if response is not None else 0)
+
+        rest_client._send = timed_send
+
+    def instrument_module(self, module):
+        exit_json = module.exit_json
+        fail_json = module.fail_json
+
+        def timed_exit_json(**kwargs):
+            exit_json(debug_timing=self.report(), **kwargs)
+
+        def timed_fail_json(**kwargs):
+            fail_json(debug_timing=self.report(), **kwargs)
+
+        module.exit_json = timed_exit_json
+        module.fail_json = timed_fail_json
+
+
+class NimOSRecordedRequests(object):
+    """Stands in for the requests module of the sdk client and hands each request to a NimOSCallRecorder."""
+
+    def __init__(self, requests_module, recorder):
+        self._requests = requests_module
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._requests, name)
+
+    def _send(self, method, url, **kwargs):
+        start = time.time()
+        response = None
+        try:
+            response = getattr(self._requests, method.lower())(url, **kwargs)
+            return response
+        finally:
+            sent = kwargs.get('json')
+            self._recorder.record(method, urlsplit(url).path.lstrip('/'),
+                                  response.status_code if response is not None else None,
+                                  time.time() - start,
+                                  len(json.dumps(sent)) if sent is not None else 0,
+                                  len(response.content) if response is not None else 0)
+
+    def get(self, url, **kwargs):
+        return self._send('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._send('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._send('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._send('DELETE', url, **kwargs)
+
+
+class NimOSChangePlan(object):
+    """Records the writes a task makes and, in check mode, keeps them from being sent to the array.
+
+    The objects the task reads are remembered, so the diff of an update is built from the GET the module already made and a
+    planned update answers with the object as it would be after the update. No request is added to the ones of the task.
+    """
+
+    # actions which only read or validate, hence are sent to the array in check mode as well and are not part of the plan
+    READ_ONLY_ACTIONS = {
+        "groups": ["check_migrate", "get_eula", "get_group_discovered_list", "get_timezone_list", "validate_merge"],
+        "initiator_groups": ["validate_lun"],
+        "volume_collections": ["validate"]
+    }
+
+    def __init__(self, apply_changes=True):
+        self.apply_changes = apply_changes
+        self.changes = []
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def remember(self, resource, objs):
+        with self._lock:
+            for obj in objs if type(objs) is list else [objs]:
+                if type(obj) is dict and obj.get('id') is not None:
+                    # a listing without detail must not hide the attributes already read for the same object
+                    known_obj = self._objects.get((resource, obj['id']))
+                    self._objects[(resource, obj['id'])] = obj if known_obj is None else dict(known_obj, **obj)
+
+    def record(self, resource, operation, ident=None, action=None, **params):
+        with self._lock:
+            server_obj = self._objects.get((resource, ident), {})
+            change = {'resource': resource, 'operation': operation}
+            if ident is not None:
+                change['id'] = ident
+            name = params.get('name', server_obj.get('name'))
+            if name is not None:
+                change['name'] = name
+            if action is not None:
+                change['action'] = action
+            change['params'] = params
+            change['before'] = dict((key, server_obj.get(key)) for key in params) if operation == 'update' else {}
+            if operation == 'delete':
+                change['before'] = dict((key, server_obj[key]) for key in ('id', 'name') if key in server_obj)
+            self.changes.append(change)
+            planned_obj = dict(server_obj)
+            planned_obj.update(params)
+            planned_obj.setdefault('id', ident)
+            return planned_obj
+
+    def instrument(self, client_obj):
+        rest_client = client_obj._client
+        get_resource = rest_client.get_resource
+        list_resources = rest_client.list_resources
+        writes = {
+            'create_resource': rest_client.create_resource,
+            'update_resource': rest_client.update_resource,
+            'delete_resource': rest_client.delete_resource,
+            'perform_resource_action': rest_client.perform_resource_action,
+            'perform_bulk_resource_action': rest_client.perform_bulk_resource_action
+        }
+
+        def planned_get_resource(resource, ident, **params):
+            obj = get_resource(resource, ident, **params)
+            self.remember(resource, obj)
+            return obj
+
+        def planned_list_resources(resource, detail=False, filter=None, limit=None, from_id=None, **params):
+            objs = list_resources(resource, detail, filter, limit, from_id, **params)
+            self.remember(resource, objs)
+            return objs
+
+        def create_resource(resource, **params):
+            planned_obj = self.record(resource, 'create', **params)
+            return writes['create_resource'](resource, **params) if self.apply_changes else planned_obj
+
+        def update_resource(resource, ident, **params):
+            planned_obj = self.record(resource, 'update', ident, **params)
+            return writes['update_resource'](resource, ident, **params) if self.apply_changes else planned_obj
+
+        def delete_resource(resource, ident, job_timeout=None):
+            self.record(resource, 'delete', ident)
+            return writes['delete_resource'](resource, ident, job_timeout) if self.apply_changes else {}
+
+        def perform_resource_action(resource, ident, action, **params):
+            if action in self.READ_ONLY_ACTIONS.get(resource, []):
+                return writes['perform_resource_action'](resource, ident, action, **params)
+            self.record(resource, 'action', ident, action, **params)
+            return writes['perform_resource_action'](resource, ident, action, **params) if self.apply_changes else {}
+
+        def perform_bulk_resource_action(resource, action, **params):
+            if action in self.READ_ONLY_ACTIONS.get(resource, []):
+                return writes['perform_bulk_resource_action'](resource, action, **params)
+            self.record(resource, 'action', None, action, **params)
+            return writes['perform_bulk_resource_action'](resource, action, **params) if self.apply_changes else {}
+
+        rest_client.get_resource = planned_get_resource
+        rest_client.list_resources = planned_list_resources
+        rest_client.create_resource = create_resource
+        rest_client.update_resource = update_resource
+        rest_client.delete_resource = delete_resource
+        rest_client.perform_resource_action = perform_resource_action
+        rest_client.perform_bulk_resource_action = perform_bulk_resource_action
+
+    def plan(self):
+        with self._lock:
+            return [dict((key, value) for key, value in change.items() if key != 'before') for change in self.changes]
+
+    def diff(self):
+        # one before/after pair per write, in the format of the diff of the ansible.builtin modules
+        diff = []
+        with self._lock:
+            for change in self.changes:
+                header = f"{change['resource']}/{change.get('name', change.get('id', ''))}"
+                if change['operation'] == 'action':
+                    after = {'action': change['action']}
+                    after.update(change['params'])
+                elif change['operation'] == 'delete':
+                    after = {}
+                else:
+                    after = change['params']
+                diff.append({'before_header': header, 'after_header': header, 'before': change['before'], 'after': after})
+        return diff
+
+    def instrument_module(self, module):
+        exit_json = module.exit_json
+
+        def planned_exit_json(**kwargs):
+            if module.check_mode is True:
+                kwargs['plan'] = self.plan()
+            if module._diff is True:
+                kwargs['diff'] = self.diff()
+            exit_json(**kwargs)
+
+        module.exit_json = planned_exit_json
+
+
+class NimOSDeadlineRequests(object):
+    """Stands in for the requests module of one sdk client and bounds its requests by a deadline, a time.time() value.
+
+    Every request gets the time left before the deadline as its timeout, and no request is sent once the deadline has passed, so a slow
+    array fails on its own instead of holding up the task.
+    """
+
+    def __init__(self, requests_module, deadline):
+        self._requests = requests_module
+        self.deadline = deadline
+
+    def __getattr__(self, name):
+        return getattr(self._requests, name)
+
+    def _send(self, method, url, **kwargs):
+        remaining = self.deadline - time.time()
+        if remaining <= 0:
+            raise self._requests.exceptions.Timeout(f"Deadline for host '{urlsplit(url).hostname}' exceeded.")
+        kwargs['timeout'] = remaining if kwargs.get('timeout') is None else min(kwargs['timeout'], remaining)
+        return getattr(self._requests, method)(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self._send('get', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._send('post', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._send('put', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._send('delete', url, **kwargs)
+
+
+def sdk_rest_client_class(requests_module):
+    """Returns a subclass of the sdk NimOSAPIClient which sends its requests, the login included, through requests_module.
+
+    The methods of the sdk call the requests module imported by restclient, which every client of the process shares. The subclass runs
+    the same functions with requests_module in its place, so what wraps the requests of one client leaves the other clients alone.
+    """
+    namespace = dict(vars(restclient), requests=requests_module)
+    methods = dict(_requests_module=requests_module)
+    for name, func in vars(NimOSAPIClient).items():
+        if isinstance(func, types.FunctionType) and 'requests' in func.__code__.co_names:
+            methods[name] = types.FunctionType(func.__code__, namespace, func.__name__, func.__defaults__, func.__closure__)
+    return type(NimOSAPIClient.__name__, (NimOSAPIClient,), methods)
+
+
+def new_sdk_client(hostname, username, password, app_name, port=None, requests_module=None):
+    kwargs = {} if port is None else dict(port=port)
+    if requests_module is None:
+        return client.NimOSClient(hostname, username, password, app_name, **kwargs)
+    # NimOSClient only holds the rest client it creates, hence give it one sending through requests_module instead
+    client_obj = client.NimOSClient.__new__(client.NimOSClient)
+    client_obj._client = sdk_rest_client_class(requests_module)(hostname, username, password, app_name, **kwargs)
+    return client_obj
+
+
+def get_nimos_client(module):
+    # only for the modules which write, the plan keeps every object listed, read-only modules use connect_nimos_client
+    client_obj = connect_nimos_client(module)
+    if module.check_mode is True or module._diff is True:
+        plan = NimOSChangePlan(apply_changes=module.check_mode is False)
+        plan.instrument(client_obj)
+        plan.instrument_module(module)
+    return client_obj
+
+
+def connect_nimos_client(module):
+    recorder = None
+    if module.params.get("debug_timing") is True:
+        recorder = NimOSCallRecorder()
+        recorder.instrument_module(module)
+
+    if has_httpapi_connection(module):
+        client_obj = NimOSHttpApiClient(Connection(module._socket_path))
+        if recorder is not None:
+            recorder.instrument_httpapi(client_obj._client)
+        return client_obj
+    requests_module = None
+    if recorder is not None:
+        # only the requests of the client of this recorder, the login included, are recorded
+        requests_module = NimOSRecordedRequests(restclient.requests, recorder)
+
+    return connect_nimos_host(module.params["host"], module.params["username"], module.params["password"], module.params.get("session_cache"),
+                              module.params.get("session_cache_path"), module.params.get("session_cache_ttl"), requests_module)
+
+
+def connect_nimos_host(hostname, username, password, session_cache=False, session_cache_path=None, session_cache_ttl=DEFAULT_SESSION_CACHE_TTL,
+                       requests_module=None):
+    app_name = f"HPE Nimble Ansible Modules v{__version__}"
+
+    if session_cache is not True or SessionManager is None:
+        return new_sdk_client(hostname, username, password, app_name, requests_module=requests_module)
+    try:
+        return NimOSSessionCache(session_cache_path, session_cache_ttl).get_client(hostname, username, password, app_name,
+                                                                                   requests_module=requests_module)
+    except (IOError, OSError):
+        # an unusable cache file must never fail the task
+        return new_sdk_client(hostname, username, password, app_name, requests_module=requests_module)
+
+
+class NimOSNameResolver(object):
+    """Caches the name to id mapping of the NimOS collections for one client.
+
+    Objects created, renamed or deleted through the client are dropped from the cache, so a later lookup goes to the array again.
+    """
+
+    def __init__(self, client_obj):
+        # the resolver is the value of a cache keyed by the client, hence it must not keep the client alive
+        self._client_ref = weakref.ref(client_obj)
+        self._ids = {}
+        self._prefetched = set()
+        rest_client = client_obj._client
+        sdk_create = rest_client.create_resource
+        sdk_update = rest_client.update_resource
+        sdk_delete = rest_client.delete_resource
+
+        def create_resource(resource, **params):
+            resp = sdk_create(resource, **params)
+            self.invalidate(resource, name=params.get('name'))
+            return resp
+
+        def update_resource(resource, ident, **params):
+            resp = sdk_update(resource, ident, **params)
+            if 'name' in params:
+                self.invalidate(resource, ident=ident)
+            return resp
+
+        def delete_resource(resource, ident, job_timeout=None):
+            resp = sdk_delete(resource, ident, job_timeout)
+            self.invalidate(resource, ident=ident)
+            return resp
+
+        rest_client.create_resource = create_resource
+        rest_client.update_resource = update_resource
+        rest_client.delete_resource = delete_resource
+
+    @property
+    def _client_obj(self):
+        return self._client_ref()
+
+    def prefetch(self, collection):
+        # one listing of the whole collection answers every later lookup in it
+        resp = getattr(self._client_obj, collection).list(fields="id,name")
+        self._ids[collection] = dict((obj.attrs.get('name'), obj.attrs.get('id')) for obj in resp)
+        self._prefetched.add(collection)
+        return self._ids[collection]
+
+    def resolve(self, collection, name):
+        if is_null_or_empty(name):
+            return None
+        ids = self._ids.setdefault(collection, {})
+        if name in ids:
+            return ids[name]
+        if collection in self._prefetched:
+            return None
+        resp = getattr(self._client_obj, collection).get(name=name)
+        if resp is None:
+            return None
+        ids[name] = resp.attrs.get('id')
+        return ids[name]
+
+    def invalidate(self, collection, name=None, ident=None):
+        ids = self._ids.get(collection)
+        if ids is None:
+            return
+        if name is not None:
+            ids.pop(name, None)
+        if ident is not None:
+            for key in [key for key, value in list(ids.items()) if value == ident]:
+                ids.pop(key)
+        # the listing is no longer complete, names not in the cache have to be looked up again
+        self._prefetched.discard(collection)
+
+
+_name_resolvers = weakref.WeakKeyDictionary()
+_name_resolvers_lock = threading.Lock()
+
+
+def get_name_resolver(client_obj):
+    # the resolver wraps the write methods of the rest client, hence two threads must not both create one for the same client
+    with _name_resolvers_lock:
+        resolver = _name_resolvers.get(client_obj)
+        if resolver is None:
+            resolver = _name_resolvers[client_obj] = NimOSNameResolver(client_obj)
+        return resolver
+
+
+def parse_nimos_version(version):
+    """Turns a NimOS version such as '5.2.1.0-919013-opt' into a tuple of integers, (5, 2, 1, 0), which compares numerically."""
+    if is_null_or_empty(version):
+        return None
+    parts = []
+    for segment in str(version).split('-')[0].split('.'):
+        match = re.match(r'\d+', segment.strip())
+        if match is None:
+            break
+        parts.append(int(match.group()))
+    return tuple(parts) if parts.__len__() > 0 else None
+
+
+class NimOSCapabilities(object):
+    """Reads the NimOS version of the group once for one client and answers the feature checks against it.
+
+    A group whose arrays run different versions, such as during an upgrade, is treated as running the oldest one.
+    """
+
+    # minimum NimOS version of the features the modules check for
+    FEATURES = {
+        "group_encryption_config": (5, 1),
+        "user_policies": (5, 1, 0)
+    }
+
+    def __init__(self, rest_client):
+        # the capabilities are the value of a cache keyed by the rest client, hence they must not keep it alive
+        self._rest_client_ref = weakref.ref(rest_client)
+        self._version = None
+        self._fetched = False
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        with self._lock:
+            if self._fetched is False:
+                resp = self._rest_client_ref().list_resources("arrays", detail=True, fields="version")
+                versions = [parse_nimos_version(array.get('version')) for array in resp or []]
+                versions = [version for version in versions if version is not None]
+                self._version = min(versions) if versions.__len__() > 0 else None
+                self._fetched = True
+            return self._version
+
+    def is_above_or_equal(self, version):
+        version_to_check = parse_nimos_version(version) if isinstance(version, str) else version
+        if version_to_check is None or self.version is None:
+            return False
+        return self.version >= version_to_check
+
+    def supports(self, feature):
+        if feature not in self.FEATURES:
+            raise Exception(f"Unknown NimOS feature '{feature}'.")
+        return self.is_above_or_equal(self.FEATURES[feature])
+
+
+_capabilities = weakref.WeakKeyDictionary()
+_capabilities_lock = threading.Lock()
+
+
+def get_capabilities(client_obj):
+    # a client and each of its collections share the same rest client, hence the version is read once for all of them
+    rest_client = client_obj._client
+    with _capabilities_lock:
+        capabilities = _capabilities.get(rest_client)
+        if capabilities is None:
+            capabilities = _capabilities[rest_client] = NimOSCapabilities(rest_client)
+        return capabilities
+
+
+def iter_list(collection, page_size=DEFAULT_PAGE_SIZE, limit=None, **kwargs):
+    """Yields the objects of a NimOS collection, reading them one page at a time.
+
+    Only one page is held in memory and no further page is asked for once limit objects have been yielded.
+    """
+    start_row = 0
+    previous_ids = None
+    while limit is None or start_row < limit:
+        size = page_size if limit is None else min(page_size, limit - start_row)
+        page = collection.list(limit=size, startRow=start_row, **kwargs)
+        if page is None:
+            return
+        if page.__len__() > size:
+            # the endpoint does not support paging and returned everything at once
+            for obj in page[:None if limit is None else limit - start_row]:
+                yield obj
+            return
+        page_ids = [getattr(obj, 'attrs', {}).get('id') for obj in page]
+        if page_ids.__len__() > 0 and page_ids == previous_ids:
+            # the endpoint ignores startRow and returned the first page again
+            return
+        previous_ids = page_ids
+        for obj in page:
+            yield obj
+        start_row += page.__len__()
+        if page.__len__() < size:
+            return
+
+
+def intialize_info_subset(client_obj):
+
+    info_subset = {
+        "all": client_obj,
+        "minimum": client_obj,
+        "config": client_obj,
+        "access_control_records": client_obj.access_control_records,
+        "alarms": client_obj.alarms,
+        "application_servers": client_obj.application_servers,
+        "application_categories": client_obj.application_categories,
+        "arrays": client_obj.arrays,
+        "chap_users": client_obj.chap_users,
+        "controllers": client_obj.controllers,
+        "disks": client_obj.disks,
+        "fibre_channel_interfaces": client_obj.fibre_channel_interfaces,
+        "fibre_channel_configs": client_obj.fibre_channel_configs,
+        "fibre_channel_initiator_aliases": client_obj.fibre_channel_initiator_aliases,
+        "fibre_channel_ports": client_obj.fibre_channel_ports,
+        "folders": client_obj.folders,
+        "groups": client_obj.groups,
+        "initiator_groups": client_obj.initiator_groups,
+        "initiators": client_obj.initiators,
+        "master_key": client_obj.master_key,
+        "network_configs": client_obj.network_configs,
+        "network_interfaces": client_obj.network_interfaces,
+        "performance_policies": client_obj.performance_policies,
+        "pools": client_obj.pools,
+        "protection_schedules": client_obj.protection_schedules,
+        "protection_templates": client_obj.protection_templates,
+        "protocol_endpoints": client_obj.protocol_endpoints,
+        "replication_partners": client_obj.replication_partners,
+        "shelves": client_obj.shelves,
+        "snapshots": client_obj.snapshots,
+        "snapshot_collections": client_obj.snapshot_collections,
+        "software_versions": client_obj.software_versions,
+        "user_groups": client_obj.user_groups,
+        "user_policies": client_obj.user_policies,
+        "users": client_obj.users,
+        "volumes": client_obj.volumes,
+        "volume_collections": client_obj.volume_collections
+    }
+    return info_subset
+
+
+def count_objects(collection, **params):
+    """Returns the number of objects of a NimOS collection without reading them.
+
+    Only a one row page holding the id of the first object is asked for, the count is the totalRows of that page.
+    """
+    rest_client = collection._client
+    endpoint = f"{rest_client._ENDPOINTS[collection.resource_type]}/detail"
+    params = dict(params, pageSize=1, fields="id")
+    if isinstance(rest_client, NimOSHttpApiRestClient):
+        code, response = rest_client._send('GET', endpoint, None, [urlencode(params)])
+    else:
+        url = f"https://{rest_client.hostname}:{rest_client.port}/{endpoint}"
+        # the requests module the client sends through, see sdk_rest_client_class
+        requests_module = getattr(rest_client, '_requests_module', restclient.requests)
+        try:
+            resp = requests_module.get(url, params=params, headers=rest_client._headers, verify=False)
+            if resp.status_code == 401 and 'SM_http_unauthorized' in str(resp.content):
+                # same as the sdk client, log in again once the session token has expired
+                rest_client._refresh_connection()
+                resp = requests_module.get(url, params=params, headers=rest_client._headers, verify=False)
+        except requests_module.exceptions.RequestException as error:
+            # raised the way the sdk client raises it
+            raise ConnectionError(f"Error retrieving data from {rest_client.hostname}") from error
+        try:
+            code, response = resp.status_code, resp.json()
+        except ValueError:
+            # such as the html page of a proxy or of a failing web server
+            raise exceptions.NimOSAPIError(f"Invalid response from {rest_client.hostname} with HTTP status {resp.status_code}.")
+    if code >= 400 or 'messages' in response:
+        raise exceptions.NimOSAPIError(response.get('messages', response))
+    if 'totalRows' in response:
+        return response['totalRows']
+    # the endpoint does not support paging and returned every object
+    data = response.get('data')
+    return data.__len__() if isinstance(data, list) else 1
+
+
 def get_vol_id(client_obj, vol_name):
     if is_null_or_empty(vol_name):
         return None
     else:
-        resp = client_obj.volumes.get(name=vol_name)
+        resp = get_name_resolver(client_obj).resolve("volumes", vol_name)
         if resp is None:
             raise Exception(f"Invalid value for volume {vol_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_volcoll_id(client_obj, volcoll_name):
     if is_null_or_empty(volcoll_name):
         return None
     else:
-        resp = client_obj.volume_collections.get(name=volcoll_name)
+        resp = get_name_resolver(client_obj).resolve("volume_collections", volcoll_name)
         if resp is None:
             raise Exception(f"Invalid value for volcoll {volcoll_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_owned_by_group_id(client_obj, owned_by_group_name):
     if is_null_or_empty(owned_by_group_name):
         return None
     else:
-        resp = client_obj.groups.get(name=owned_by_group_name)
+        resp = get_name_resolver(client_obj).resolve("groups", owned_by_group_name)
         if resp is None:
             raise Exception(f"Invalid value for owned by group {owned_by_group_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_pool_id(client_obj, pool_name):
     if is_null_or_empty(pool_name):
         return None
     else:
-        resp = client_obj.pools.get(name=pool_name)
+        resp = get_name_resolver(client_obj).resolve("pools", pool_name)
         if resp is None:
             raise Exception(f"Invalid value for pool {pool_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_folder_id(client_obj, folder_name):
     if is_null_or_empty(folder_name):
         return None
     else:
-        resp = client_obj.folders.get(name=folder_name)
+        resp = get_name_resolver(client_obj).resolve("folders", folder_name)
         if resp is None:
             raise Exception(f"Invalid value for folder {folder_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_perfpolicy_id(client_obj, perfpolicy_name):
     if is_null_or_empty(perfpolicy_name):
         return None
     else:
-        resp = client_obj.performance_policies.get(name=perfpolicy_name)
+        resp = get_name_resolver(client_obj).resolve("performance_policies", perfpolicy_name)
         if resp is None:
             raise Exception(f"Invalid value for performance policy: {perfpolicy_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_prottmpl_id(client_obj, prottmpl_name):
     if is_null_or_empty(prottmpl_name):
         return None
     else:
-        resp = client_obj.protection_templates.get(name=prottmpl_name)
+        resp = get_name_resolver(client_obj).resolve("protection_templates", prottmpl_name)
         if resp is None:
             raise Exception(f"Invalid value for protection template {prottmpl_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_chap_user_id(client_obj, chap_user_name):
     if is_null_or_empty(chap_user_name):
         return None
     else:
-        resp = client_obj.chap_users.get(name=chap_user_name)
+        resp = get_name_resolver(client_obj).resolve("chap_users", chap_user_name)
         if resp is None:
             raise Exception(f"Invalid value for chap user {chap_user_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_pe_id(client_obj, pe_name):
     if is_null_or_empty(pe_name):
         return None
     else:
-        resp = client_obj.protocol_endpoints.get(name=pe_name)
+        resp = get_name_resolver(client_obj).resolve("protocol_endpoints", pe_name)
         if resp is None:
             raise Exception(f"Invalid value for protection endpoint {pe_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_snapshot_id(client_obj, vol_name, snap_name):
@@ -266,10 +1193,10 @@ def get_replication_partner_id(client_obj, replication_partner_name):
     if is_null_or_empty(replication_partner_name):
         return None
     else:
-        resp = client_obj.replication_partners.get(name=replication_partner_name)
+        resp = get_name_resolver(client_obj).resolve("replication_partners", replication_partner_name)
         if resp is None:
             raise Exception(f"Invalid value for replication partner {replication_partner_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_volcoll_or_prottmpl_id(client_obj, volcoll_name, prot_template_name):
@@ -293,40 +1220,23 @@ def get_downstream_partner_id(client_obj, downstream_partner):
     if is_null_or_empty(downstream_partner):
         return None
     else:
-        resp = client_obj.replication_partners.get(name=downstream_partner)
+        resp = get_name_resolver(client_obj).resolve("replication_partners", downstream_partner)
         if resp is None:
             raise Exception(f"Invalid value for downstream partner {downstream_partner}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def get_initiator_group_id(client_obj, ig_name):
     if is_null_or_empty(ig_name):
         return None
     else:
-        resp = client_obj.initiator_groups.get(name=ig_name)
+        resp = get_name_resolver(client_obj).resolve("initiator_groups", ig_name)
         if resp is None:
             raise Exception(f"Invalid value for initiator group {ig_name}")
-        return resp.attrs.get("id")
+        return resp
 
 
 def is_array_version_above_or_equal(array_obj_client, arr_version_to_check):
     if arr_version_to_check is None:
         return False
-    resp = array_obj_client.get()
-    if resp is None:
-        return False
-    array_version = resp.attrs.get("version")
-    if array_version is None:
-        return False
-
-    temp = array_version.split('-')
-    array_version = temp[0]
-    arr_version = array_version.split('.')
-    version_to_check = arr_version_to_check.split('.')
-    if arr_version[0] > version_to_check[0]:
-        return True
-    elif arr_version[0] >= version_to_check[0] and arr_version[1] >= version_to_check[1]:
-        return True
-    elif arr_version[0] >= version_to_check[0] and arr_version[1] >= version_to_check[1] and arr_version[2] >= version_to_check[2]:
-        return True
-    return False
+    return get_capabilities(array_obj_client).is_above_or_equal(arr_version_to_check)
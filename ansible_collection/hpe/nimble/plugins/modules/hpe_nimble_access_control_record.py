@@ -38,17 +38,41 @@ options:
     type: str
     description:
     - Name for the CHAP user.
+  exclusive:
+    required: False
+    type: bool
+    default: False
+    description:
+    - With I(records) and state "present" or "create", also delete the access control records of the volumes of I(records) that are not listed.
+    - Nothing is deleted when a volume, an initiator group or a CHAP user of I(records) is not present on the array.
   initiator_group:
-    required: True
+    required: False
     type: str
     description:
-    - The initiator group name.
+    - The initiator group name. Required when I(records) is not given.
   lun:
     required: False
     type: int
     description:
     - If this access control record applies to a regular volume, this attribute is the volume's LUN (Logical Unit Number).
     - If the access protocol is iSCSI, the LUN will be 0. However, if the access protocol is Fibre Channel, the LUN will be in the range from 0 to 2047.
+  max_workers:
+    required: False
+    type: int
+    default: 4
+    description:
+    - Maximum number of access control records of I(records) created or deleted at the same time.
+  records:
+    required: False
+    type: list
+    elements: dict
+    description:
+    - List of access control records to manage in a single task, in place of I(volume) and I(initiator_group). Each entry needs a volume and an
+      initiator_group and can carry the options apply_to, chap_user and lun. An option left out of an entry is taken from the task.
+    - The access control records, volumes and initiator groups are read once for the whole list, and only the records to create or delete are
+      sent to the array.
+    - A record whose attributes differ is replaced by creating the new record before deleting the old one. The old record is deleted first only
+      when the array rejects the new one, and is restored when the new one still cannot be created.
   state:
     required: True
     choices:
@@ -59,10 +83,10 @@ options:
     description:
     - The access control record operation.
   volume:
-    required: True
+    required: False
     type: str
     description:
-    - The name of the volume that this access control record applies to.
+    - The name of the volume that this access control record applies to. Required when I(records) is not given.
 extends_documentation_fragment: hpe.nimble.hpe_nimble
 short_description: Manage the HPE Nimble Storage access control records
 version_added: "1.0.0"
@@ -93,8 +117,50 @@ EXAMPLES = r'''
     initiator_group: "{{ initiator_group }}"
     state: "absent" # fail if volume does not exist
 
+# Export the volumes to every node of a cluster and remove any other export of these volumes
+- name: Reconcile access control records
+  hpe.nimble.hpe_nimble_access_control_record:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    records:
+      - volume: "{{ volume }}"
+        initiator_group: "{{ initiator_group }}"
+      - volume: "{{ volume }}"
+        initiator_group: "{{ initiator_group }}-2"
+        apply_to: volume
+    exclusive: true
+    state: present
+
 '''
 RETURN = r'''
+records:
+  description: Result of each entry of I(records), in the given order.
+  returned: when records is given
+  type: list
+  elements: dict
+  sample: [
+    {
+      "volume": "vol-1",
+      "initiator_group": "ig-1",
+      "return_status": true,
+      "changed": true,
+      "msg": "Created access control record for volume 'vol-1' with initiator group 'ig-1'."
+    }
+  ]
+removed:
+  description: Access control records deleted because I(exclusive) is set and they are not listed in I(records).
+  returned: when records and exclusive are given
+  type: list
+  elements: dict
+  sample: [
+    {
+      "id": "0d28eada7f8dd99d3b000000000000000000000001",
+      "volume": "vol-1",
+      "initiator_group": "ig-old",
+      "apply_to": "both"
+    }
+  ]
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -102,8 +168,13 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
+from concurrent.futures import ThreadPoolExecutor
+
+# options an entry of records can carry
+bulk_acr_options = ["volume", "initiator_group", "apply_to", "chap_user", "lun"]
+# attributes read for each access control record in records mode
+acr_fields = "id,vol_id,vol_name,initiator_group_id,initiator_group_name,apply_to,chap_user_id,lun"
 
 
 def create_acr(
@@ -174,6 +245,191 @@ def delete_acr(
         return (False, False, f"Access control record deletion failed | {ex}")
 
 
+def parse_acr_record(record, defaults):
+    if isinstance(record, dict) is False:
+        raise Exception("Each entry of 'records' should be provided as dictionary.")
+    acr_spec = dict(defaults)
+    for key, value in record.items():
+        if key not in bulk_acr_options:
+            raise Exception(f"Invalid option '{key}' provided for access control record of volume '{record.get('volume')}'. "
+                            f"Valid options are: {', '.join(bulk_acr_options)}.")
+        if value is not None:
+            acr_spec[key] = value
+    if utils.is_null_or_empty(acr_spec['volume']) or utils.is_null_or_empty(acr_spec['initiator_group']):
+        raise Exception("Each entry of 'records' should have a volume and an initiator_group.")
+    if acr_spec['apply_to'] is not None and acr_spec['apply_to'] not in ('volume', 'snapshot', 'both'):
+        raise Exception(f"Option 'apply_to' of access control record of volume '{acr_spec['volume']}' must be one of: volume, snapshot, both.")
+    if acr_spec['lun'] is not None:
+        try:
+            acr_spec['lun'] = int(acr_spec['lun'])
+        except (TypeError, ValueError):
+            raise Exception(f"Invalid value for option 'lun' of access control record of volume '{acr_spec['volume']}'.")
+    return acr_spec
+
+
+def replace_acr(client_obj, params, old_acrs):
+    # an access control record cannot be updated. The new record is created before the old ones are deleted, so that the volume
+    # stays exported, unless the array rejects it as colliding with an old one.
+    try:
+        acr_resp = client_obj.access_control_records.create(**params)
+    except Exception:
+        if old_acrs.__len__() == 0:
+            raise
+        for acr in old_acrs:
+            client_obj.access_control_records.delete(acr['id'])
+        try:
+            acr_resp = client_obj.access_control_records.create(**params)
+        except Exception as ex:
+            # put the old records back rather than leave the volume without an export
+            for acr in old_acrs:
+                client_obj.access_control_records.create(**utils.remove_null_args(
+                    initiator_group_id=acr.get('initiator_group_id'), vol_id=acr.get('vol_id'), apply_to=acr.get('apply_to'),
+                    chap_user_id=acr.get('chap_user_id') or None, lun=acr.get('lun')))
+            raise Exception(f"{ex}. The replaced access control record(s) were restored.")
+        return acr_resp
+    for acr in old_acrs:
+        client_obj.access_control_records.delete(acr['id'])
+    return acr_resp
+
+
+def bulk_acrs(
+        client_obj,
+        state,
+        records,
+        defaults,
+        exclusive=False,
+        max_workers=1):
+
+    if utils.is_null_or_empty(records):
+        return (False, False, "Please provide atleast one access control record.", [], [])
+    try:
+        acr_specs = [parse_acr_record(record, defaults) for record in records]
+        keys = [(acr_spec['volume'], acr_spec['initiator_group'], acr_spec['apply_to']) for acr_spec in acr_specs]
+        repeated = sorted(set(f"{key[0]}/{key[1]}" for key in keys if keys.count(key) > 1))
+        if repeated.__len__() > 0:
+            raise Exception(f"Access control record(s) '{', '.join(repeated)}' provided more than once. Please remove the duplicate entries.")
+
+        # one listing each of the volumes, the initiator groups and the access control records
+        resolver = utils.get_name_resolver(client_obj)
+        vol_ids = resolver.prefetch("volumes")
+        ig_ids = resolver.prefetch("initiator_groups")
+        if any(utils.is_null_or_empty(acr_spec['chap_user']) is False for acr_spec in acr_specs):
+            resolver.prefetch("chap_users")
+        acrs_by_pair = {}
+        for acr in utils.iter_list(client_obj.access_control_records, detail=True, fields=acr_fields):
+            acrs_by_pair.setdefault((acr.attrs.get('vol_id'), acr.attrs.get('initiator_group_id')), []).append(acr.attrs)
+    except Exception as ex:
+        return (False, False, f"{ex}", [], [])
+
+    # work out in memory which records to create and which to delete
+    results = [None] * acr_specs.__len__()
+    to_create = {}
+    to_delete = {}
+    kept = set()
+    # entries whose volume, initiator group or chap user is not on the array
+    unresolved = set()
+    for index, acr_spec in enumerate(acr_specs):
+        volume = acr_spec['volume']
+        initiator_group = acr_spec['initiator_group']
+        vol_id = vol_ids.get(volume)
+        ig_id = ig_ids.get(initiator_group)
+        if vol_id is None:
+            results[index] = (False, False, f"Volume name '{volume}' is not present on array.", {})
+            unresolved.add(index)
+            continue
+        if ig_id is None:
+            results[index] = (False, False, f"Initiator Group '{initiator_group}' is not present on array.", {})
+            unresolved.add(index)
+            continue
+        chap_user_id = resolver.resolve("chap_users", acr_spec['chap_user'])
+        if utils.is_null_or_empty(acr_spec['chap_user']) is False and chap_user_id is None:
+            results[index] = (False, False, f"CHAP user '{acr_spec['chap_user']}' is not present on array.", {})
+            unresolved.add(index)
+            continue
+        params = utils.remove_null_args(apply_to=acr_spec['apply_to'], chap_user_id=chap_user_id, lun=acr_spec['lun'])
+        existing = [acr for acr in acrs_by_pair.get((vol_id, ig_id), [])
+                    if acr_spec['apply_to'] is None or acr.get('apply_to') == acr_spec['apply_to']]
+
+        if state == "absent":
+            for acr in existing:
+                to_delete[acr['id']] = index
+            if existing.__len__() == 0:
+                results[index] = (True, False, f"No access control record for initiator group '{initiator_group}' associated with volume "
+                                  f"'{volume}' found.", {})
+            continue
+
+        matching = [acr for acr in existing if params.items() <= acr.items()]
+        if matching.__len__() > 0:
+            kept.update(acr['id'] for acr in matching)
+            if state == "create":
+                results[index] = (False, False, f"Access control record for volume '{volume}' with initiator group '{initiator_group}' cannot "
+                                  "be created as it is already present.", {})
+            else:
+                results[index] = (True, False, f"Access control record for volume '{volume}' with initiator group '{initiator_group}' is "
+                                  "already present.", matching[0])
+            continue
+        # the records with other attributes are replaced by the new one
+        kept.update(acr['id'] for acr in existing)
+        to_create[index] = (dict(initiator_group_id=ig_id, vol_id=vol_id, **params), existing)
+
+    removed = []
+    # an entry that could not be resolved, such as a mistyped initiator group, may be the one meant to keep a live export,
+    # hence nothing unlisted is deleted unless every entry could be resolved
+    if exclusive is True and state != "absent" and unresolved.__len__() == 0:
+        listed_vol_ids = set(vol_ids.get(acr_spec['volume']) for acr_spec in acr_specs)
+        for (vol_id, ig_id), acrs in acrs_by_pair.items():
+            if vol_id not in listed_vol_ids:
+                continue
+            for acr in acrs:
+                if acr['id'] not in kept:
+                    to_delete[acr['id']] = None
+                    removed.append(dict(id=acr['id'], volume=acr.get('vol_name'), initiator_group=acr.get('initiator_group_name'),
+                                        apply_to=acr.get('apply_to')))
+
+    # creates go first so that the volumes keep being exported while the unlisted records are removed
+    errors = {}
+    executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+    try:
+        pending = dict((executor.submit(replace_acr, client_obj, params, old_acrs), index) for index, (params, old_acrs) in to_create.items())
+        for future, index in pending.items():
+            try:
+                acr_resp = future.result()
+                results[index] = (True, True, f"Created access control record for volume '{acr_specs[index]['volume']}' with initiator group "
+                                  f"'{acr_specs[index]['initiator_group']}'.", acr_resp.attrs)
+            except Exception as ex:
+                errors[index] = f"Access control record creation failed | {ex}"
+        pending = dict((executor.submit(client_obj.access_control_records.delete, acr_id), (acr_id, index)) for acr_id, index in to_delete.items())
+        for future, (acr_id, index) in pending.items():
+            try:
+                future.result()
+            except Exception as ex:
+                errors.setdefault(index, f"Access control record deletion failed | {ex}")
+    finally:
+        executor.shutdown(wait=True)
+
+    for index, acr_spec in enumerate(acr_specs):
+        if index in errors:
+            results[index] = (False, False, errors[index], {})
+        elif results[index] is None:
+            results[index] = (True, True, f"Successfully deleted access control record for initiator group '{acr_spec['initiator_group']}' "
+                              f"associated with volume '{acr_spec['volume']}'.", {})
+
+    record_results = []
+    for acr_spec, (return_status, changed, msg, resp) in zip(acr_specs, results):
+        record_result = dict(volume=acr_spec['volume'], initiator_group=acr_spec['initiator_group'], return_status=return_status, changed=changed, msg=msg)
+        if utils.is_null_or_empty(resp) is False:
+            record_result['attrs'] = resp
+        record_results.append(record_result)
+    if None in errors:
+        return (False, True, f"Failed to delete unlisted access control record(s) | {errors[None]}", record_results, removed)
+    failed = [f"{result['volume']}/{result['initiator_group']}" for result in record_results if result['return_status'] is False]
+    changed = removed.__len__() > 0 or any(result['changed'] for result in record_results)
+    if failed.__len__() > 0:
+        return (False, changed, f"Failed to apply access control record(s) '{', '.join(failed)}'.", record_results, removed)
+    return (True, changed, f"Applied {record_results.__len__()} access control record(s), "
+            f"{sum(1 for result in record_results if result['changed'])} changed, {removed.__len__()} unlisted removed.", record_results, removed)
+
+
 def main():
 
     fields = {
@@ -196,48 +452,67 @@ def main():
             "type": "int"
         },
         "volume": {
-            "required": True,
+            "required": False,
             "type": "str"
         },
         "initiator_group": {
-            "required": True,
+            "required": False,
             "type": "str"
+        },
+        "records": {
+            "required": False,
+            "type": "list",
+            "elements": 'dict'
+        },
+        "exclusive": {
+            "required": False,
+            "type": "bool",
+            "default": False
+        },
+        "max_workers": {
+            "required": False,
+            "type": "int",
+            "default": 4
         }
     }
     default_fields = utils.basic_auth_arg_fields()
     fields.update(default_fields)
+    required_one_of = [('volume', 'records')]
+    required_together = [('volume', 'initiator_group')]
+    mutually_exclusive = [('volume', 'records'), ('initiator_group', 'records')]
 
-    module = AnsibleModule(argument_spec=fields)
+    module = AnsibleModule(argument_spec=fields, required_one_of=required_one_of, required_together=required_together,
+                           mutually_exclusive=mutually_exclusive)
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     state = module.params["state"]
     apply_to = module.params["apply_to"]
     chap_user = module.params["chap_user"]
     lun = module.params["lun"]
     volume = module.params["volume"]
     initiator_group = module.params["initiator_group"]
+    records = module.params["records"]
+    exclusive = module.params["exclusive"]
+    max_workers = module.params["max_workers"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
     # defaults
     return_status = changed = False
     msg = "No task to run."
     resp = None
+    record_results = removed = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
-        if state == "create" or state == "present":
+        if records is not None:
+            defaults = dict(apply_to=apply_to, chap_user=chap_user, lun=lun)
+            return_status, changed, msg, record_results, removed = bulk_acrs(client_obj, state, records, defaults, exclusive, max_workers)
+
+        elif state == "create" or state == "present":
             return_status, changed, msg, resp = create_acr(
                 client_obj,
                 state,
@@ -257,7 +532,15 @@ def main():
         # failed for some reason.
         msg = str(ex)
 
-    if return_status:
+    if record_results is not None:
+        results = dict(records=record_results)
+        if exclusive is True:
+            results['removed'] = removed
+        if return_status:
+            module.exit_json(return_status=return_status, changed=changed, msg=msg, **results)
+        else:
+            module.fail_json(return_status=return_status, changed=changed, msg=msg, **results)
+    elif return_status:
         if utils.is_null_or_empty(resp):
             module.exit_json(return_status=return_status, changed=changed, msg=msg)
         else:
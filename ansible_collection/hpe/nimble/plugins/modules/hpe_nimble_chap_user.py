@@ -100,7 +100,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -211,9 +210,6 @@ def main():
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     change_name = module.params["change_name"]
     description = module.params["description"]
     initiator_iqns = module.params["initiator_iqns"]
@@ -221,7 +217,7 @@ def main():
     user_password = module.params["user_password"]
     state = module.params["state"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
 
@@ -230,12 +226,7 @@ def main():
     msg = "No task to run."
     resp = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if state == "create" or state == "present":
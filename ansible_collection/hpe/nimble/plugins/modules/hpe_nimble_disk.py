@@ -82,7 +82,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -150,16 +149,13 @@ def main():
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     state = module.params["state"]
     disk_op = module.params["disk_op"]
     slot = module.params["slot"]
     shelf_location = module.params["shelf_location"]
     force = module.params["force"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
 
@@ -168,12 +164,7 @@ def main():
     msg = "No task to run."
     resp = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if state == "present":
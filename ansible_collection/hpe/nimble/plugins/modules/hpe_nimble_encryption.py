@@ -131,7 +131,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -293,9 +292,6 @@ def main():
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     active = module.params["active"]
     age = module.params["age"]
     encryption_config = module.params["encryption_config"]
@@ -306,7 +302,7 @@ def main():
     new_passphrase = module.params["new_passphrase"]
     state = module.params["state"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
 
@@ -315,12 +311,7 @@ def main():
     msg = "No task to run."
     resp = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if ((purge_inactive is None or purge_inactive is False)
@@ -120,7 +120,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -257,9 +256,6 @@ def main():
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     array_name_or_serial = module.params["array_name_or_serial"]
     controller = module.params["controller"]
     hw_upgrade = module.params["hw_upgrade"]
@@ -270,7 +266,7 @@ def main():
     state = module.params["state"]
     wwnn_base_str = module.params["wwnn_base_str"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
 
@@ -279,12 +275,7 @@ def main():
     msg = "No task to run."
     resp = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if state == "present":
@@ -40,7 +40,8 @@ options:
         "protection_templates", "protocol_endpoints", "replication_partners", "shelves", "snapshots", "snapshot_collections", "software_versions",
         "user_groups", "user_policies", "users", "volumes", "volume_collections".
 
-      - Each subset except "all", "minimum" and "config" supports four types of subset options. Subset "all" supports limit and detail as subset options.
+      - Each subset except "all", "minimum" and "config" supports six types of subset options. Subset "all" supports limit, detail and profile as
+        subset options.
         Subset "config" and "minimum" does not support any subset options.
 
       - See the example section for usage of the following subset options.
@@ -48,6 +49,92 @@ options:
       - limit - An integer value which represents how many latest items to show for a given subset.
       - detail - A bool flag when set to true fetches everything for a given subset. Default is "True".
       - query - A key-value pair to query.
+      - profile - A named set of attributes to fetch instead of listing them in fields. "minimal" fetches the id and name, or the attributes identifying
+        the object for subsets without a name such as access_control_records, disks and initiators, "full" everything, and
+        "capacity", "performance" and "protection" the space usage, the performance settings and the snapshot and replication state of the
+        objects. The last three are supported by the subsets arrays, folders, groups, performance_policies, pools, protection_schedules,
+        snapshot_collections, snapshots, volume_collections and volumes where they apply. With subset "all", the subsets that do not
+        support the profile are fetched in full.
+      - filter - A list of expressions "<attribute> <operator> <value>" that the objects have to match, all of them. The operators are ==, !=,
+        >, >=, <, <=, in, not in, contains and startswith, the last two ignoring the case. A value is a number, a string, true, false,
+        null, a list such as [a, b] for in and not in, or a time relative to now such as now-30d (units s, m, h, d and w) to compare
+        with creation_time or last_modified. The expressions are sent to the array as an advanced criteria filter, so that only the
+        matching objects are read. Attributes of nested objects, such as avg_stats_last_5mins.read_iops, the subsets controllers, disks,
+        shelves and software_versions, and any filter the array rejects are evaluated on the objects as they are read instead.
+  max_workers:
+    required: False
+    default: 4
+    type: int
+    description:
+      - Maximum number of requests sent to the array at the same time, shared between the subsets. Set it to 1 to fetch the subsets one
+        after another.
+  cache_dir:
+    required: False
+    type: path
+    description:
+      - Directory in which the result of each subset is cached. Caching is disabled when not given.
+      - A cached subset is only reused for the same host, the same user and the same subset options.
+  cache_ttl:
+    required: False
+    default: 300
+    type: int
+    description:
+      - Number of seconds a cached subset is served from I(cache_dir) before it is fetched from the array again.
+  refresh:
+    required: False
+    default: False
+    type: bool
+    description:
+      - Fetch every subset from the array even if a fresh copy is cached, and update the cache with it.
+  delta:
+    required: False
+    default: False
+    type: bool
+    description:
+      - Refresh the cached "volumes", "snapshots", "volume_collections" and "initiator_groups" subsets incrementally once they are older than
+        I(cache_ttl). Only the objects modified since the previous run are read, and a listing of the object ids drops the deleted ones.
+      - Requires I(cache_dir). Subsets asked for with the limit option or with detail set to false are always fetched in full.
+  hosts:
+    required: False
+    type: list
+    elements: raw
+    description:
+      - Management addresses of several Nimble groups to collect the same subsets from, in place of I(host). An entry can also be a dictionary
+        with the keys C(host), C(username) and C(password), to use other credentials than I(username) and I(password) for that group.
+      - The groups are collected concurrently, each with its own login. I(nimble_info) is then keyed by host, and the groups that could not
+        be collected are reported in I(failed_hosts) without failing the task, unless none of them could be collected.
+      - The groups are connected to with the nimble-sdk client, hence I(hosts) cannot be used over the C(hpe.nimble.nimble) httpapi
+        connection. With I(debug_timing) the requests made to all the groups are listed together.
+  max_hosts:
+    required: False
+    default: 8
+    type: int
+    description:
+      - Maximum number of groups of I(hosts) collected at the same time.
+  output_format:
+    required: False
+    default: list
+    choices:
+      - list
+      - columnar
+    type: str
+    description:
+      - Shape of the lists of objects in I(nimble_info). With "list" each object is a dictionary of its attributes.
+      - With "columnar" each list of objects becomes a dictionary holding C(columns), the attribute names, and C(rows), one list of values per
+        object in the order of C(columns). The attribute names are then sent once instead of once per object, which makes large subsets much
+        smaller to return and to hold on the controller.
+  output_path:
+    required: False
+    type: path
+    description:
+      - Write the collected information as gzip compressed JSON to this file, on the host the module runs on, instead of returning it in
+        I(nimble_info). The task then returns I(output_path) and I(output_bytes).
+  host_timeout:
+    required: False
+    type: int
+    description:
+      - Number of seconds each group of I(hosts) is given. Once they are over no request is sent to that group any more, and it is reported
+        in I(failed_hosts). No limit when not given.
 extends_documentation_fragment: hpe.nimble.hpe_nimble
 short_description: Collect information from HPE Nimble Storage array
 version_added: "1.0.0"
@@ -122,10 +209,105 @@ EXAMPLES = r'''
   ansible.builtin.debug:
     msg: "{{ array_info['nimble_info'] }}"
 
+- name: Collect the space usage of all volumes and only the names of the initiator groups
+  hpe.nimble.hpe_nimble_info:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    gather_subset:
+      - volumes:
+          profile: capacity
+      - initiator_groups:
+          profile: minimal
+  register: array_info
+
+- name: Collect the volumes larger than 1 TiB and the snapshots of vol1 older than 30 days
+  hpe.nimble.hpe_nimble_info:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    gather_subset:
+      - volumes:
+          fields:
+            - name
+            - size
+          filter:
+            - "size > 1048576"
+      - snapshots:
+          query:
+            vol_name: "vol1"
+          filter:
+            - "creation_time < now-30d"
+            - "name startswith daily"
+  register: array_info
+
+- name: Collect volumes, reusing the result of an earlier run for up to 10 minutes
+  hpe.nimble.hpe_nimble_info:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    cache_dir: "/tmp/nimble_info_cache"
+    cache_ttl: 600
+    gather_subset:
+      - volumes:
+          fields: "name,id"
+  register: array_info
+
+- name: Collect the default information of every group of the fleet, giving each group at most 2 minutes
+  hpe.nimble.hpe_nimble_info:
+    hosts:
+      - 192.168.1.10
+      - 192.168.1.11
+      - host: 192.168.2.10
+        username: admin
+        password: "{{ dr_password }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    max_hosts: 16
+    host_timeout: 120
+    gather_subset:
+      - minimum:
+  register: fleet_info
+
+- name: Collect all the snapshots of a volume as columns and rows
+  hpe.nimble.hpe_nimble_info:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    output_format: columnar
+    gather_subset:
+      - snapshots:
+          query:
+            vol_name: "vol1"
+  register: array_info
+
+- name: Write all the volumes to a compressed file instead of returning them
+  hpe.nimble.hpe_nimble_info:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    output_path: "/tmp/nimble_volumes.json.gz"
+    gather_subset:
+      - volumes:
+
+- name: Collect volumes and snapshots, reading only what changed since the previous run
+  hpe.nimble.hpe_nimble_info:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    cache_dir: "/tmp/nimble_info_cache"
+    delta: true
+    gather_subset:
+      - volumes:
+      - snapshots:
+          query:
+            vol_name: "vol1"
+  register: array_info
+
 '''
 RETURN = r'''
 nimble_info:
-  description: Returns the information collected from the HPE Nimble Storage array
+  description: Returns the information collected from the HPE Nimble Storage array. Keyed by host when I(hosts) is given.
   returned: always
   type: complex
   contains: {}
@@ -517,16 +699,49 @@ nimble_info:
       }
     ]
   }
+snapshots_api_calls:
+  description:
+    - Number of list requests, one per page read, made to collect the snapshots of the 'all' subset, the volume listing included.
+    - 0 when the 'all' subset is served from I(cache_dir).
+  returned: when the 'all' subset is gathered
+  type: int
+  sample: 12
+output_path:
+  description: File the collected information was written to.
+  returned: when output_path is given
+  type: str
+  sample: "/tmp/nimble_volumes.json.gz"
+output_bytes:
+  description: Size of the compressed file written to I(output_path).
+  returned: when output_path is given
+  type: int
+  sample: 184320
+failed_hosts:
+  description: Error of each group of I(hosts) that could not be collected, keyed by host.
+  returned: when hosts is given
+  type: dict
+  sample: {
+    "192.168.1.12": "Error connecting to 192.168.1.12"
+  }
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 try:
     from nimbleclient.v1 import client
+    from nimbleclient import exceptions
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import gzip
+import hashlib
+import itertools
+import json
+import os
 import re
+import threading
+import time
 
 limit_not_supported = [
     "controllers",
@@ -535,6 +750,188 @@ limit_not_supported = [
     "software_versions"
 ]
 
+# attributes identifying the objects of the subsets which have no name attribute, read by the "minimal" profile instead of id and name
+minimal_fields = {
+    "access_control_records": ["id", "vol_name", "initiator_group_name", "apply_to"],
+    "alarms": ["id", "type", "object_name"],
+    "disks": ["id", "serial", "slot"],
+    "fibre_channel_configs": ["id"],
+    "fibre_channel_initiator_aliases": ["id", "alias", "wwpn"],
+    "fibre_channel_ports": ["id", "fc_port_name", "controller_name"],
+    "initiators": ["id", "initiator_group_name", "iqn", "wwpn"],
+    "shelves": ["id", "serial"],
+    "software_versions": ["name", "version"],
+    "user_policies": ["id"]
+}
+
+# attributes read by each projection profile of a subset on top of the "minimal" ones, next to "full" which reads every attribute
+subset_profiles = {
+    "volumes": {
+        "capacity": ["size", "pool_name", "thinly_provisioned", "reserve", "limit", "total_usage_bytes", "vol_usage_compressed_bytes",
+                     "vol_usage_uncompressed_bytes", "vol_usage_mapped_bytes", "snap_reserve", "snap_usage_compressed_bytes",
+                     "snap_usage_uncompressed_bytes", "space_usage_level", "usage_valid"],
+        "performance": ["perfpolicy_name", "block_size", "limit_iops", "limit_mbps", "cache_policy", "caching_enabled", "cache_pinned",
+                        "dedupe_enabled", "num_connections", "avg_stats_last_5mins"],
+        "protection": ["volcoll_name", "protection_type", "num_snaps", "online_snaps", "last_snap", "replication_role", "last_replicated_snap",
+                       "srep_last_sync"]
+    },
+    "snapshots": {
+        "capacity": ["vol_name", "size", "new_data_compressed_bytes", "new_data_uncompressed_bytes", "new_data_valid"],
+        "protection": ["vol_name", "creation_time", "expiry_time", "schedule_name", "snap_collection_name", "online", "is_replica",
+                       "replication_status", "is_manually_managed"]
+    },
+    "snapshot_collections": {
+        "protection": ["volcoll_name", "creation_time", "num_snaps", "sched_name", "online_status", "is_complete", "is_replica", "repl_status",
+                       "repl_complete_time"]
+    },
+    "volume_collections": {
+        "protection": ["protection_type", "volume_count", "volume_list", "schedule_list", "replication_type", "replication_partner",
+                       "last_snapcoll", "last_replicated_snapcoll", "lag_time", "snapcoll_count", "synchronous_replication_state"]
+    },
+    "protection_schedules": {
+        "protection": ["volcoll_or_prottmpl_type", "active", "period", "period_unit", "at_time", "days", "num_retain", "num_retain_replica",
+                       "downstream_partner_name", "replicate_every", "last_snap_time", "next_snap_time"]
+    },
+    "pools": {
+        "capacity": ["capacity", "free_space", "usage", "unused_reserve", "vol_count", "snap_count", "savings_ratio", "data_reduction_ratio",
+                     "compression_ratio", "dedupe_ratio", "usage_valid"],
+        "performance": ["all_flash", "dedupe_capable", "cache_capacity", "pinnable_cache_capacity", "pinned_cache_capacity"]
+    },
+    "arrays": {
+        "capacity": ["raw_capacity_bytes", "usable_capacity_bytes", "available_bytes", "usage", "vol_usage_bytes", "snap_usage_bytes",
+                     "vol_saved_bytes", "snap_saved_bytes", "dedupe_usage_bytes", "usage_valid"],
+        "performance": ["model", "extended_model", "all_flash", "usable_cache_capacity_bytes"]
+    },
+    "folders": {
+        "capacity": ["pool_name", "capacity_bytes", "usage_bytes", "free_space_bytes", "limit_bytes", "provisioned_bytes", "volume_mapped_bytes",
+                     "compressed_vol_usage_bytes", "compressed_snap_usage_bytes", "usage_valid"],
+        "performance": ["limit_iops", "limit_mbps", "inherited_vol_perfpol_name"],
+        "protection": ["num_snaps", "num_snapcolls"]
+    },
+    "groups": {
+        "capacity": ["usable_capacity_bytes", "free_space", "usage", "unused_reserve_bytes", "compressed_vol_usage_bytes",
+                     "compressed_snap_usage_bytes", "uncompressed_vol_usage_bytes", "uncompressed_snap_usage_bytes", "savings_ratio",
+                     "data_reduction_ratio", "usage_valid"],
+        "performance": ["raw_cache_capacity", "usable_cache_capacity", "num_connections"],
+        "protection": ["num_snaps", "num_snapcolls", "default_snap_reserve", "default_snap_warn_level", "repl_throttled_bandwidth"]
+    },
+    "performance_policies": {
+        "performance": ["block_size", "cache", "cache_policy", "compress", "dedupe_enabled", "space_policy", "app_category", "volume_count"]
+    }
+}
+
+projection_profiles = ["minimal", "capacity", "performance", "protection", "full"]
+
+
+def get_profile_fields(subset_name, profile):
+    # the fields string of a profile, None when every attribute is to be read
+    if profile == "full":
+        return None
+    fields = minimal_fields.get(subset_name, ["id", "name"])
+    if profile != "minimal":
+        fields = fields + subset_profiles[subset_name][profile]
+    return ",".join(fields)
+
+
+def is_profile_supported(subset_name, profile):
+    return profile in ("minimal", "full") or profile in subset_profiles.get(subset_name, {})
+
+
+# operators of the subset filter expressions, and the NimOS advanced criteria operator each of them is sent to the array as
+filter_operators = {
+    "==": "equals",
+    "!=": "notEqual",
+    ">": "greaterThan",
+    ">=": "greaterOrEqual",
+    "<": "lessThan",
+    "<=": "lessOrEqual",
+    "in": "inSet",
+    "not in": "notInSet",
+    "contains": "iContains",
+    "startswith": "iStartsWith"
+}
+
+# the same operators applied to the objects read from the array
+filter_predicates = {
+    "==": lambda value, expected: value == expected,
+    "!=": lambda value, expected: value != expected,
+    ">": lambda value, expected: value is not None and value > expected,
+    ">=": lambda value, expected: value is not None and value >= expected,
+    "<": lambda value, expected: value is not None and value < expected,
+    "<=": lambda value, expected: value is not None and value <= expected,
+    "in": lambda value, expected: value in expected,
+    "not in": lambda value, expected: value not in expected,
+    "contains": lambda value, expected: value is not None and str(expected).lower() in str(value).lower(),
+    "startswith": lambda value, expected: value is not None and str(value).lower().startswith(str(expected).lower())
+}
+
+filter_expression = re.compile(r'^\s*([A-Za-z_][\w.]*)\s+(==|!=|>=|<=|>|<|not\s+in|in|contains|startswith)\s+(.+?)\s*$')
+# a point in time relative to now, such as "now-30d", compared with the creation_time and last_modified epoch seconds
+relative_time = re.compile(r'^now(?:\s*-\s*(\d+)\s*([smhdw]))?$')
+time_units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_filter_value(text, now):
+    match = relative_time.match(text)
+    if match is not None:
+        return int(now - int(match.group(1) or 0) * time_units[match.group(2) or 's'])
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    if text.startswith('[') and text.endswith(']'):
+        return [parse_filter_value(item.strip(), now) for item in text[1:-1].split(',') if item.strip() != ""]
+    return text.strip('"\'')
+
+
+def parse_subset_filter(expressions, now=None):
+    # each expression is "<attribute> <operator> <value>", an object has to match all of them
+    now = time.time() if now is None else now
+    conditions = []
+    for expression in expressions:
+        match = filter_expression.match(expression) if isinstance(expression, str) else None
+        if match is None:
+            raise Exception(f"Invalid filter expression '{expression}'. Expected '<attribute> <operator> <value>' with one of the operators: "
+                            f"{', '.join(filter_operators)}.")
+        operator = re.sub(r'\s+', ' ', match.group(2))
+        value = parse_filter_value(match.group(3), now)
+        if operator in ("in", "not in") and isinstance(value, list) is False:
+            raise Exception(f"Invalid filter expression '{expression}'. Operator '{operator}' needs a list of values.")
+        conditions.append({'attribute': match.group(1), 'operator': operator, 'value': value})
+    return conditions
+
+
+def compile_subset_filter(subset_name, conditions):
+    # the conditions the array can evaluate become advanced criteria, the others are evaluated on the objects read
+    criteria = []
+    predicates = []
+    for condition in conditions:
+        if '.' in condition['attribute'] or subset_name in limit_not_supported:
+            predicates.append(condition)
+        else:
+            criteria.append({'fieldName': condition['attribute'], 'operator': filter_operators[condition['operator']], 'value': condition['value']})
+    return (criteria, predicates)
+
+
+def get_attribute_path(record, attribute):
+    value = record
+    for key in attribute.split('.'):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def is_condition_matched(record, condition):
+    return filter_predicates[condition['operator']](get_attribute_path(record, condition['attribute']), condition['value'])
+
+
+# subsets whose objects carry a modification time, hence can be refreshed incrementally, and the attribute holding it
+delta_supported = {
+    "volumes": "last_modified",
+    "snapshots": "last_modified",
+    "volume_collections": "last_modified_time",
+    "initiator_groups": "last_modified"
+}
+
 
 def add_to_valid_subset_list(valid_subset_list,
                              subset_name,
@@ -544,7 +941,7 @@ def add_to_valid_subset_list(valid_subset_list,
     if valid_subset_list is None:
         return []
     valid_subset = {}
-    fields = query = limit = None
+    fields = query = limit = subset_filter = None
     detail = True  # default
     count = -1
 
@@ -555,6 +952,14 @@ def add_to_valid_subset_list(valid_subset_list,
                 temp += item + ','
             fields = temp.strip(',')
             # fields = subset_options['fields'].strip()
+        if 'profile' in subset_options and subset_options['profile'] is not None:
+            if is_profile_supported(subset_name, subset_options['profile']) is True:
+                fields = get_profile_fields(subset_name, subset_options['profile'])
+            elif fetch_all is False:
+                supported = [profile for profile in projection_profiles if is_profile_supported(subset_name, profile)]
+                raise Exception(f"Profile '{subset_options['profile']}' is not supported by subset '{subset_name}'. "
+                                f"Supported profiles are: {', '.join(supported)}.")
+            # in case of subset 'all', subsets without the profile are fetched in full
         if 'detail' in subset_options and subset_options['detail'] is not None:
             detail = subset_options['detail']
         if 'limit' in subset_options:
@@ -566,10 +971,15 @@ def add_to_valid_subset_list(valid_subset_list,
 
     if subset_options is not None and 'query' in subset_options:
         query = subset_options['query']
+    if subset_options is not None and subset_options.get('filter') is not None:
+        # parsed here so that an invalid expression fails before anything is read
+        parse_subset_filter(subset_options['filter'])
+        subset_filter = subset_options['filter']
 
     valid_subset['name'] = subset_name.lower()
     valid_subset['fields'] = fields
     valid_subset['query'] = query
+    valid_subset['filter'] = subset_filter
     valid_subset['limit'] = limit
     valid_subset['detail'] = detail
     valid_subset['count'] = count
@@ -583,8 +993,8 @@ def is_subset_option_valid(subset_options):
     if isinstance(subset_options, dict) is False:
         raise Exception("Subset options should be provided as dictionary.")
     for key, value in subset_options.items():
-        if key != "fields" and key != "query" and key != "limit" and key != "detail":
-            return (False, key, "Valid subset option names are:'fields', 'query', 'limit', and 'detail'")
+        if key not in ("fields", "query", "limit", "detail", "profile", "filter"):
+            return (False, key, "Valid subset option names are:'fields', 'query', 'limit', 'detail', 'profile' and 'filter'")
         if key == 'limit' and type(value) is not int:
             return (False, key, "Subset options 'limit' should be provided as integer.")
         if key == 'detail' and type(value) is not bool:
@@ -593,6 +1003,12 @@ def is_subset_option_valid(subset_options):
             return (False, key, "Subset options 'fields' should be provided as list.")
         if key == 'query' and type(value) is not dict:
             return (False, key, "Subset options 'query' should be provided as dict.")
+        if key == 'filter' and type(value) is not list:
+            return (False, key, "Subset options 'filter' should be provided as list.")
+        if key == 'profile' and value not in projection_profiles:
+            return (False, key, f"Subset options 'profile' should be one of: {', '.join(projection_profiles)}.")
+    if 'fields' in subset_options and 'profile' in subset_options:
+        return (False, 'profile', "Subset options 'fields' and 'profile' are mutually exclusive.")
     return (True, "", "")
 
 
@@ -609,10 +1025,10 @@ def handle_all_subset(info_subset, valid_subset_list, subset_options):
 
     if valid_subset_list is None or info_subset is None:
         return []
-    msg = "Subset options 'fields and query' cannot be used with 'all' subset. Only 'limit and detail' option can be used."
+    msg = "Subset options 'fields, query and filter' cannot be used with 'all' subset. Only 'limit, detail and profile' option can be used."
 
     if subset_options is not None:
-        if 'fields' in subset_options or 'query' in subset_options:
+        if 'fields' in subset_options or 'query' in subset_options or 'filter' in subset_options:
             raise Exception(msg)
 
     for key, value in info_subset.items():
@@ -767,202 +1183,353 @@ def fetch_config_subset(info_subset):
         raise
 
 
-def fetch_minimum_subset(info_subset):
+def fetch_minimum_subset(info_subset, max_workers=1):
 
     if info_subset is None:
         return ({}, True)
-    minimum_subset = [
-        "arrays",
+    # subsets of which only the number of objects is shown
+    count_subset = [
         "disks",
         "folders",
-        "groups",
         "initiator_groups",
-        "performance_policies",
-        "pools",
         "protection_schedules",
         "protection_templates",
         "protocol_endpoints",
         "snapshot_collections",
-        "software_versions",
         "users",
         "volumes",
         "volume_collections"
     ]
     toreturn = {'default': {}}
     result = {}
-    temp_dict = {}
 
+    def fetch_groups():
+        # certain fields were only added in NimOS 5.1 and above
+        if utils.get_capabilities(info_subset['arrays']).supports("group_encryption_config"):
+            return info_subset['groups'].list(detail=True,
+                                              fields="encryption_config,name,fc_enabled,iscsi_enabled,leader_array_name,default_iscsi_target_scope,num_snaps")
+        return info_subset['groups'].list(detail=True, fields="name")
+
+    executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
     try:
-        for key in minimum_subset:
-            cl_obj = info_subset[key]
-            if key == 'arrays':
-                resp = cl_obj.list(detail=True, fields="extended_model,full_name,all_flash")
-            elif key == 'groups':
-                # certain fields were only added in NimOS 5.1 and above
-                if utils.is_array_version_above_or_equal(info_subset['arrays'], "5.1"):
-                    resp = cl_obj.list(detail=True,
-                                       fields="encryption_config,name,fc_enabled,iscsi_enabled,leader_array_name,default_iscsi_target_scope,num_snaps")
-                else:
-                    resp = cl_obj.list(detail=True, fields="name")
-            else:
-                resp = cl_obj.list(detail=False)
-            temp_dict[key] = resp
+        # every subset is independent of the others, hence they are all read at the same time
+        arrays = executor.submit(info_subset['arrays'].list, detail=True, fields="extended_model,full_name,all_flash")
+        groups = executor.submit(fetch_groups)
+        software_versions = executor.submit(info_subset['software_versions'].list, detail=False)
+        counts = [(key, executor.submit(utils.count_objects, info_subset[key])) for key in count_subset]
         # prepare
-        result['volumes'] = len(temp_dict['volumes'])
-        result['volume_collections'] = len(temp_dict['volume_collections'])
-        result['users'] = len(temp_dict['users'])
-        result['software_versions'] = temp_dict['software_versions'][-1].attrs.get('version')  # get the latest
-        result['snapshot_collections'] = len(temp_dict['snapshot_collections'])
-        result['snapshots'] = temp_dict['groups'][-1].attrs.get('num_snaps')
-        result['protocol_endpoints'] = len(temp_dict['protocol_endpoints'])
-        result['protection_templates'] = len(temp_dict['protection_templates'])
-        result['protection_schedules'] = len(temp_dict['protection_schedules'])
-        result['initiator_groups'] = len(temp_dict['initiator_groups'])
-        result['folders'] = len(temp_dict['folders'])
-        result['disks'] = len(temp_dict['disks'])
-        result['folders'] = len(temp_dict['folders'])
-        result['arrays'] = generate_dict('arrays', temp_dict['arrays'])['arrays']
-        result['groups'] = generate_dict('groups', temp_dict['groups'])['groups']
+        for key, count in counts:
+            result[key] = count.result()
+        result['software_versions'] = software_versions.result()[-1].attrs.get('version')  # get the latest
+        result['snapshots'] = groups.result()[-1].attrs.get('num_snaps')
+        result['arrays'] = generate_dict('arrays', arrays.result())['arrays']
+        result['groups'] = generate_dict('groups', groups.result())['groups']
         toreturn['default'] = result
         return (toreturn, True)
     except Exception as ex:
         result['failed'] = str(ex)
         toreturn['default'] = result
         return (toreturn, False)
+    finally:
+        executor.shutdown(wait=True)
 
 # snapshots actually needs a vol_name/vol_id as mandatory params. Hence ,in case of 'all' subset
 # where user cannot provide a query option. we need to fetch the snapshots by iterating
 # over the list of volumes and see if those volumes have snapshots.
 
 
-def fetch_snapshots_for_all_subset(subset, client_obj):
+class PageCounter(object):
+    """Stands in for a NimOS collection read with utils.iter_list and counts the pages listed through it, one request each."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._lock = threading.Lock()
+        self.pages = 0
+
+    def list(self, **kwargs):
+        with self._lock:
+            self.pages += 1
+        return self._collection.list(**kwargs)
+
+
+def fetch_snapshots_for_all_subset(subset, client_obj, max_workers=1, stats=None):
     if subset is None or client_obj is None:
         return {}
     result = {}
     total_snap = []
-    # get the volume list
-    vol_list_resp = client_obj.volumes.list(detail=False)
-    if vol_list_resp is not None and vol_list_resp.__len__() > 0:
-        for vol_item in vol_list_resp:
-            vol_name = vol_item.attrs.get('name')
-            snap_list = client_obj.snapshots.list(detail=subset['detail'], vol_name=vol_name, limit=subset['limit'])
-            if snap_list is not None and snap_list.__len__() > 0:
-                total_snap.extend(snap_list)
-                if subset['limit'] is not None and total_snap.__len__() >= subset['limit']:
-                    total_snap = total_snap[0:subset['limit']]
-                    break
+    volumes = PageCounter(client_obj.volumes)
+    snapshots = PageCounter(client_obj.snapshots)
+    # get the volume list. num_snaps tells which volumes have snapshots, so only those are listed afterwards
+    vol_list_resp = utils.iter_list(volumes, detail=True, fields="id,name,num_snaps")
+    if vol_list_resp is not None:
+        vol_ids = (vol_item.attrs.get('id') for vol_item in vol_list_resp if vol_item.attrs.get('num_snaps') != 0)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        def submit_next():
+            vol_id = next(vol_ids, None)
+            if vol_id is not None:
+                pending.append(executor.submit(lambda: list(utils.iter_list(snapshots, limit=subset['limit'], detail=subset['detail'], vol_id=vol_id))))
+            return vol_id is not None
+
+        try:
+            # keep at most max_workers requests in flight and consume them in volume order, so that the
+            # walk stops as soon as the limit is met
+            for _ in range(max_workers):
+                submit_next()
+            while pending.__len__() > 0:
+                snap_list = pending.popleft().result()
+                if snap_list is not None and snap_list.__len__() > 0:
+                    total_snap.extend(snap_list)
+                    if subset['limit'] is not None and total_snap.__len__() >= subset['limit']:
+                        total_snap = total_snap[0:subset['limit']]
+                        for future in pending:
+                            future.cancel()
+                        break
+                submit_next()
+        finally:
+            executor.shutdown(wait=True)
         if total_snap.__len__() > 0:
             result['snapshots'] = generate_dict('snapshots', total_snap)['snapshots']
+    if stats is not None:
+        stats['snapshots_api_calls'] = volumes.pages + snapshots.pages
+    return result
+
+
+def read_filtered_subset(subset, cl_obj_set, query, criteria, predicates):
+    count = subset['count'] if subset['count'] != -1 else None
+    fields = subset['fields']
+    detail = subset['detail']
+    returned_fields = None
+    if predicates.__len__() > 0:
+        # the attributes filtered on here are read as well, and left out of the result when they were not asked for
+        returned_fields = subset['fields'].split(',') if subset['fields'] is not None else (None if detail is True else ['id', 'name'])
+        if returned_fields is not None:
+            filtered_fields = [condition['attribute'].split('.')[0] for condition in predicates]
+            fields = ','.join(returned_fields + [field for field in dict.fromkeys(filtered_fields) if field not in returned_fields])
+        detail = True
+    params = dict(query, detail=detail, fields=fields)
+    if criteria.__len__() > 0:
+        params['filter'] = {'operator': 'and', 'criteria': criteria}
+
+    if subset['name'] in limit_not_supported:
+        objs = cl_obj_set.list(**params) or []
+    else:
+        # the limit can only be passed on when the array does all the filtering
+        objs = utils.iter_list(cl_obj_set, limit=count if predicates.__len__() == 0 else None, **params)
+    # the pages are filtered as they are read, so only the matching objects are held
+    records = (obj.attrs for obj in objs)
+    if predicates.__len__() > 0:
+        records = (record for record in records if all(is_condition_matched(record, condition) for condition in predicates))
+    if returned_fields is not None:
+        records = (dict((key, record[key]) for key in returned_fields if key in record) for record in records)
+    return list(itertools.islice(records, count))
+
+
+def fetch_filtered_subset(subset, cl_obj_set, query):
+    conditions = parse_subset_filter(subset['filter'])
+    criteria, predicates = compile_subset_filter(subset['name'], conditions)
+    try:
+        return read_filtered_subset(subset, cl_obj_set, query, criteria, predicates)
+    except exceptions.NimOSAPIError:
+        if criteria.__len__() == 0:
+            raise
+    # the array could not filter on one of the attributes, hence every condition is evaluated on the objects read
+    return read_filtered_subset(subset, cl_obj_set, query, [], conditions)
+
+
+def fetch_subset_details(subset, info_subset, max_workers=1, stats=None):
+    result = {}
+    if subset['name'] == "minimum":
+        result, flag = fetch_minimum_subset(info_subset, max_workers)
+        if flag is False:
+            raise Exception(result)
+    elif subset['name'] == "config":
+        result, flag = fetch_config_subset(info_subset)
+        if flag is False:
+            raise Exception(result)
+    elif subset['name'] == "all":
+        result = fetch_snapshots_for_all_subset(subset, info_subset['all'], max_workers, stats)
+    else:
+        # if subset is user_policies then make sure nimos aversion is fiji and above
+        if subset['name'] == 'user_policies' and utils.get_capabilities(info_subset['arrays']).supports("user_policies") is False:
+            return result
+        cl_obj_set = info_subset[subset['name']]
+        query = subset['query'] if subset['query'] is not None else {}
+        if subset.get('filter') is not None:
+            result[subset['name']] = fetch_filtered_subset(subset, cl_obj_set, query)
+            return result
+        if subset['name'] in limit_not_supported:
+            resp = cl_obj_set.list(detail=subset['detail'], **query, fields=subset['fields'])
+            # limit is not supported for few subset, hence for those slice the result and keep the number as asked by user.
+            if resp is not None and subset['count'] != -1 and resp.__len__() > subset['count']:
+                resp = resp[: subset['count']]
+        else:
+            # read the subset page by page and stop once the limit is met, so that the whole subset is never held twice
+            resp = utils.iter_list(cl_obj_set,
+                                   limit=subset['count'] if subset['count'] != -1 else None,
+                                   detail=subset['detail'],
+                                   fields=subset['fields'],
+                                   **query)
+        result[subset['name']] = generate_dict('data', resp).get('data', [])
     return result
 
 
-def fetch_subset(valid_subset_list, info_subset):
+class SubsetCache(object):
+    """Keeps the result of each subset in its own JSON file under cache_dir and serves it back while it is fresh.
+
+    The file name is derived from the host, the user and every subset option, so a subset asked for with other options, or by a user
+    who may see other objects, is fetched again.
+    """
+
+    def __init__(self, cache_dir, ttl, host, refresh=False, delta=False, username=None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.host = host
+        self.username = username
+        self.refresh = refresh
+        self.delta = delta
+
+    def _path(self, subset):
+        key = json.dumps([self.host, self.username, subset], sort_keys=True, default=str)
+        return os.path.join(self.cache_dir, f"hpe_nimble_info_{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json")
+
+    def load(self, subset):
+        if self.refresh is True:
+            return None
+        try:
+            with open(self._path(subset), 'r') as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get('created', 0) <= self.ttl
+
+    def get(self, subset):
+        entry = self.load(subset)
+        if entry is None or self.is_fresh(entry) is False:
+            return None
+        return entry.get('result')
+
+    def put(self, subset, result, **extra):
+        path = self._path(subset)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(dict(extra, created=time.time(), result=result), cache_file, separators=(',', ':'))
+            os.replace(temp_path, path)
+        except (IOError, OSError, TypeError, ValueError):
+            # a cache that cannot be written must not fail the fact gathering
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def is_delta_supported(subset):
+    return subset['name'] in delta_supported and subset['count'] == -1 and subset['detail'] is True and subset.get('filter') is None
+
+
+def fetch_delta_subset_details(subset, info_subset, cache):
+    cl_obj_set = info_subset[subset['name']]
+    query = subset['query'] if subset['query'] is not None else {}
+    modified_field = delta_supported[subset['name']]
+    # id and the modification time are needed to merge the changes, hence always read them and drop them again from the output
+    requested_fields = subset['fields'].split(',') if subset['fields'] is not None else None
+    fields = None
+    if requested_fields is not None:
+        fields = ','.join(requested_fields + [key for key in ['id', modified_field] if key not in requested_fields])
+    cache_key = dict(subset, delta=True)
+    entry = cache.load(cache_key)
+
+    if entry is not None and cache.is_fresh(entry) is True:
+        records = entry['result']
+    elif entry is None or entry.get('since') is None:
+        records = [item.attrs for item in utils.iter_list(cl_obj_set, detail=True, fields=fields, **query)]
+    else:
+        # list the ids before the changes, so that an object created in between is still picked up as a change
+        current_ids = set(item.attrs.get('id') for item in utils.iter_list(cl_obj_set, detail=False, **query))
+        since_filter = {
+            'operator': 'and',
+            'criteria': [{'fieldName': modified_field, 'operator': 'greaterOrEqual', 'value': entry['since']}]
+        }
+        changed = {}
+        for item in utils.iter_list(cl_obj_set, detail=True, fields=fields, filter=since_filter, **query):
+            changed[item.attrs.get('id')] = item.attrs
+        records = [changed.pop(record.get('id'), record) for record in entry['result'] if record.get('id') in current_ids]
+        records.extend(changed.values())
+
+    if entry is None or cache.is_fresh(entry) is False:
+        modified = [record.get(modified_field) for record in records if record.get(modified_field) is not None]
+        since = max(modified) if modified.__len__() > 0 else (entry or {}).get('since')
+        cache.put(cache_key, records, since=since)
+    if requested_fields is not None:
+        records = [dict((key, record[key]) for key in requested_fields if key in record) for record in records]
+    return {subset['name']: records}
+
+
+def fetch_cached_subset_details(subset, info_subset, max_workers=1, stats=None, cache=None):
+    if cache is not None and cache.delta is True and is_delta_supported(subset):
+        return fetch_delta_subset_details(subset, info_subset, cache)
+    if cache is not None:
+        result = cache.get(subset)
+        if result is not None:
+            if subset['name'] == "all" and stats is not None:
+                # the snapshots were not walked
+                stats['snapshots_api_calls'] = 0
+            return result
+    result = fetch_subset_details(subset, info_subset, max_workers, stats)
+    if cache is not None:
+        cache.put(subset, result)
+    return result
+
+
+def fetch_subset(valid_subset_list, info_subset, max_workers=1, stats=None, cache=None):
     if valid_subset_list is None or isinstance(valid_subset_list, list) is False:
         return {}
+    result_dict = {}
+    # the subsets are independent of each other, hence fetch them concurrently over the same client. The max_workers requests
+    # allowed in flight are shared out between the subsets, minimum and all reading with several requests of their own
+    subset_workers = max(min(max_workers, valid_subset_list.__len__()), 1)
+    request_workers = max(max_workers // subset_workers, 1)
+    executor = ThreadPoolExecutor(max_workers=subset_workers)
     try:
-        result_dict = {}
-        resp = None
-        for subset in valid_subset_list:
-            result = {}
+        futures = [executor.submit(fetch_cached_subset_details, subset, info_subset, request_workers, stats, cache) for subset in valid_subset_list]
+        # collect the results in the order the subsets were given, so that the output and the reported error are stable
+        for subset, future in zip(valid_subset_list, futures):
             try:
-                if subset['name'] == "minimum":
-                    result, flag = fetch_minimum_subset(info_subset)
-                    if flag is False:
-                        raise Exception(result)
-                elif subset['name'] == "config":
-                    result, flag = fetch_config_subset(info_subset)
-                    if flag is False:
-                        raise Exception(result)
-                elif subset['name'] == "all":
-                    result = fetch_snapshots_for_all_subset(subset, info_subset['all'])
-                    for key, value in result.items():
-                        result_dict[key] = value
-                    continue
-                else:
-                    # if subset is user_policies then make sure nimos aversion is fiji and above
-                    if subset['name'] == 'user_policies' and utils.is_array_version_above_or_equal(info_subset['arrays'], "5.1.0") is False:
-                        continue
-                    cl_obj_set = info_subset[subset['name']]
-                    query = subset['query']
-                    if query is not None:
-                        resp = cl_obj_set.list(detail=subset['detail'], **query, fields=subset['fields'], limit=subset['limit'])
-                    else:
-                        resp = cl_obj_set.list(detail=subset['detail'], fields=subset['fields'], limit=subset['limit'])
-                    if resp is not None and resp.__len__() != 0:
-                        # limit is not supported for few subset, hence for those slice the result and keep the number as asked by user.
-                        if subset['count'] != -1 and resp.__len__() > subset['count']:
-                            resp = resp[: subset['count']]
-
-                        result[subset['name']] = generate_dict('data', resp)['data']
-                    else:
-                        result[subset['name']] = resp
-                for key, value in result.items():
-                    result_dict[key] = value
+                result = future.result()
             except Exception as ex:
+                for pending in futures:
+                    pending.cancel()
                 msg = f"Failed to fetch {subset['name']} details. Error:'{str(ex)}'"
                 raise Exception(msg) from ex
+            for key, value in result.items():
+                result_dict[key] = value
         return result_dict
-    except Exception:
-        raise
-
-
-def intialize_info_subset(client_obj):
-
-    info_subset = {
-        "all": client_obj,
-        "minimum": client_obj,
-        "config": client_obj,
-        "access_control_records": client_obj.access_control_records,
-        "alarms": client_obj.alarms,
-        "application_servers": client_obj.application_servers,
-        "application_categories": client_obj.application_categories,
-        "arrays": client_obj.arrays,
-        "chap_users": client_obj.chap_users,
-        "controllers": client_obj.controllers,
-        "disks": client_obj.disks,
-        "fibre_channel_interfaces": client_obj.fibre_channel_interfaces,
-        "fibre_channel_configs": client_obj.fibre_channel_configs,
-        "fibre_channel_initiator_aliases": client_obj.fibre_channel_initiator_aliases,
-        "fibre_channel_ports": client_obj.fibre_channel_ports,
-        "folders": client_obj.folders,
-        "groups": client_obj.groups,
-        "initiator_groups": client_obj.initiator_groups,
-        "initiators": client_obj.initiators,
-        "master_key": client_obj.master_key,
-        "network_configs": client_obj.network_configs,
-        "network_interfaces": client_obj.network_interfaces,
-        "performance_policies": client_obj.performance_policies,
-        "pools": client_obj.pools,
-        "protection_schedules": client_obj.protection_schedules,
-        "protection_templates": client_obj.protection_templates,
-        "protocol_endpoints": client_obj.protocol_endpoints,
-        "replication_partners": client_obj.replication_partners,
-        "shelves": client_obj.shelves,
-        "snapshots": client_obj.snapshots,
-        "snapshot_collections": client_obj.snapshot_collections,
-        "software_versions": client_obj.software_versions,
-        "user_groups": client_obj.user_groups,
-        "user_policies": client_obj.user_policies,
-        "users": client_obj.users,
-        "volumes": client_obj.volumes,
-        "volume_collections": client_obj.volume_collections
-    }
-    return info_subset
+    finally:
+        executor.shutdown(wait=True)
 
 
 def get_subset_info(
         client_obj,
-        gather_subset):
+        gather_subset,
+        max_workers=1,
+        stats=None,
+        cache=None):
 
     if utils.is_null_or_empty(gather_subset):
         return (False, False, "Please provide atleast one subset.", {})
     result_dict = []
     try:
-        info_subset = intialize_info_subset(client_obj)
+        info_subset = utils.intialize_info_subset(client_obj)
         valid_subset_list = parse_subset_list(info_subset, gather_subset)
         if valid_subset_list is not None and valid_subset_list.__len__() > 0:
             # we got subset list to work on. get the details of these subset
-            result_dict = fetch_subset(valid_subset_list, info_subset)
+            result_dict = fetch_subset(valid_subset_list, info_subset, max_workers, stats, cache)
             return (True, False, "Fetched the subset details.", result_dict)
         else:
             return (True, False, "No vaild subset provided.", result_dict)
@@ -970,6 +1537,115 @@ def get_subset_info(
         return (False, False, f"{ex}", {})
 
 
+def to_columnar(value):
+    # a list of objects becomes the names of their attributes and one row of values per object, so each name is sent once
+    if isinstance(value, dict):
+        return dict((key, to_columnar(item)) for key, item in value.items())
+    if isinstance(value, list) and value.__len__() > 0 and all(isinstance(item, dict) for item in value):
+        columns = {}
+        for item in value:
+            for key in item:
+                columns.setdefault(key, columns.__len__())
+        return {'columns': list(columns), 'rows': [[item.get(key) for key in columns] for item in value]}
+    return value
+
+
+def write_compressed_output(output_path, result_dict):
+    # written next to the final file and renamed, so that a reader never sees a partial file
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as output_file:
+            json.dump(result_dict, output_file, separators=(',', ':'), default=str)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return os.path.getsize(output_path)
+
+
+def parse_fleet_hosts(hosts, username, password):
+    sources = []
+    for entry in hosts:
+        if isinstance(entry, dict):
+            invalid = [key for key in entry if key not in ("host", "username", "password")]
+            if invalid.__len__() > 0:
+                raise Exception(f"Invalid option(s) '{', '.join(invalid)}' provided in hosts. Valid options are: host, username, password.")
+            source = dict(host=entry.get("host"), username=entry.get("username", username), password=entry.get("password", password))
+        else:
+            source = dict(host=entry, username=username, password=password)
+        if utils.is_null_or_empty(source['host']) or utils.is_null_or_empty(source['username']) or utils.is_null_or_empty(source['password']):
+            raise Exception(f"Each entry of 'hosts' needs a host, a username and a password. Invalid entry for host '{source['host']}'.")
+        sources.append(source)
+    repeated = sorted(set(source['host'] for source in sources if [other['host'] for other in sources].count(source['host']) > 1))
+    if repeated.__len__() > 0:
+        raise Exception(f"Host(s) '{', '.join(repeated)}' provided more than once. Please remove the duplicate entries.")
+    return sources
+
+
+def get_host_subset_info(
+        source,
+        gather_subset,
+        max_workers=1,
+        host_timeout=None,
+        session_cache_options=None,
+        cache_options=None,
+        recorder=None):
+
+    # the requests of the client of this group alone are recorded and bound by its deadline
+    requests_module = None
+    if recorder is not None:
+        requests_module = utils.NimOSRecordedRequests(utils.restclient.requests, recorder)
+    if host_timeout is not None:
+        requests_module = utils.NimOSDeadlineRequests(requests_module or utils.restclient.requests, time.time() + host_timeout)
+    try:
+        client_obj = utils.connect_nimos_host(source['host'], source['username'], source['password'], requests_module=requests_module,
+                                              **(session_cache_options or {}))
+        cache = None
+        if cache_options is not None:
+            cache = SubsetCache(host=source['host'], username=source['username'], **cache_options)
+        return get_subset_info(client_obj, gather_subset, max_workers, None, cache)
+    except Exception as ex:
+        return (False, False, f"{ex}", {})
+
+
+def get_fleet_info(
+        sources,
+        gather_subset,
+        max_workers=1,
+        max_hosts=1,
+        host_timeout=None,
+        session_cache_options=None,
+        cache_options=None,
+        recorder=None):
+
+    fleet_info = {}
+    failed_hosts = {}
+    executor = ThreadPoolExecutor(max_workers=max_hosts)
+    try:
+        futures = dict((executor.submit(get_host_subset_info, source, gather_subset, max_workers, host_timeout, session_cache_options,
+                                        cache_options, recorder), source['host']) for source in sources)
+        # merge each group as soon as it is done, a slow group is cut off by its own deadline
+        for future in as_completed(futures):
+            host = futures[future]
+            return_status, changed, msg, result_dict = future.result()
+            if return_status is True:
+                fleet_info[host] = result_dict
+            else:
+                failed_hosts[host] = msg
+    finally:
+        executor.shutdown(wait=True)
+
+    # keep the order in which the hosts were given
+    fleet_info = dict((source['host'], fleet_info[source['host']]) for source in sources if source['host'] in fleet_info)
+    failed_hosts = dict((source['host'], failed_hosts[source['host']]) for source in sources if source['host'] in failed_hosts)
+    if fleet_info.__len__() == 0:
+        return (False, False, "Failed to fetch the subset details of every host.", fleet_info, failed_hosts)
+    msg = f"Fetched the subset details of {fleet_info.__len__()} host(s)."
+    if failed_hosts.__len__() > 0:
+        msg = f"{msg} Failed for {failed_hosts.__len__()} host(s): {', '.join(failed_hosts)}."
+    return (True, False, msg, fleet_info, failed_hosts)
+
+
 def main():
 
     fields = {
@@ -978,44 +1654,142 @@ def main():
             "type": "list",
             "elements": 'raw',
             'default': "minimum"
+        },
+        "max_workers": {
+            "required": False,
+            "type": "int",
+            "default": 4
+        },
+        "cache_dir": {
+            "required": False,
+            "type": "path"
+        },
+        "cache_ttl": {
+            "required": False,
+            "type": "int",
+            "default": 300
+        },
+        "refresh": {
+            "required": False,
+            "type": "bool",
+            "default": False
+        },
+        "delta": {
+            "required": False,
+            "type": "bool",
+            "default": False
+        },
+        "hosts": {
+            "required": False,
+            "type": "list",
+            "elements": 'raw'
+        },
+        "max_hosts": {
+            "required": False,
+            "type": "int",
+            "default": 8
+        },
+        "host_timeout": {
+            "required": False,
+            "type": "int"
+        },
+        "output_format": {
+            "required": False,
+            "choices": ['list', 'columnar'],
+            "type": "str",
+            "default": "list"
+        },
+        "output_path": {
+            "required": False,
+            "type": "path"
         }
     }
     default_fields = utils.basic_auth_arg_fields()
     fields.update(default_fields)
-    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+    mutually_exclusive = [('host', 'hosts')]
+    module = AnsibleModule(argument_spec=fields, mutually_exclusive=mutually_exclusive, supports_check_mode=True)
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     gather_subset = module.params["gather_subset"]
-
-    if (username is None or password is None or hostname is None):
+    max_workers = module.params["max_workers"]
+    cache_dir = module.params["cache_dir"]
+    cache_ttl = module.params["cache_ttl"]
+    refresh = module.params["refresh"]
+    delta = module.params["delta"]
+    hosts = module.params["hosts"]
+    max_hosts = module.params["max_hosts"]
+    host_timeout = module.params["host_timeout"]
+    output_format = module.params["output_format"]
+    output_path = module.params["output_path"]
+
+    if hosts is None and utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
+    if max_workers < 1:
+        module.fail_json(msg="Parameter 'max_workers' should be greater than zero.")
+    if delta is True and cache_dir is None:
+        module.fail_json(msg="Parameter 'delta' requires 'cache_dir' to keep the result of the previous run.")
+    if max_hosts < 1:
+        module.fail_json(msg="Parameter 'max_hosts' should be greater than zero.")
+    if hosts is not None and utils.has_httpapi_connection(module):
+        module.fail_json(msg="Parameter 'hosts' cannot be used over the httpapi connection. Use the default connection to collect several groups.")
     # defaults
     return_status = changed = False
     msg = "No task to run."
+    stats = {}
+    cache = None
+    failed_hosts = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
-
-        return_status, changed, msg, result_dict = get_subset_info(client_obj, gather_subset)
+        if hosts is not None:
+            # every group gets its own client and cache, the session cache options of the task apply to all of them
+            sources = parse_fleet_hosts(hosts, module.params["username"], module.params["password"])
+            session_cache_options = dict(session_cache=module.params["session_cache"], session_cache_path=module.params["session_cache_path"],
+                                         session_cache_ttl=module.params["session_cache_ttl"])
+            cache_options = None
+            if cache_dir is not None:
+                cache_options = dict(cache_dir=cache_dir, ttl=cache_ttl, refresh=refresh, delta=delta)
+            recorder = None
+            if module.params["debug_timing"] is True:
+                recorder = utils.NimOSCallRecorder()
+                recorder.instrument_module(module)
+            return_status, changed, msg, result_dict, failed_hosts = get_fleet_info(
+                sources, gather_subset, max_workers, max_hosts, host_timeout, session_cache_options, cache_options, recorder)
+        else:
+            client_obj = utils.connect_nimos_client(module)
+            if cache_dir is not None:
+                cache = SubsetCache(cache_dir, cache_ttl, utils.get_host(module), refresh, delta, utils.get_username(module))
+
+            return_status, changed, msg, result_dict = get_subset_info(client_obj, gather_subset, max_workers, stats, cache)
     except Exception as ex:
         # failed for some reason.
         msg = str(ex)
 
-    if return_status:
-        if utils.is_null_or_empty(result_dict) is False and result_dict.__len__() > 0:
+    info_result = {}
+    if return_status and utils.is_null_or_empty(result_dict) is False and result_dict.__len__() > 0:
+        if output_format == "columnar":
+            result_dict = to_columnar(result_dict)
+        if output_path is None:
+            info_result['nimble_info'] = result_dict
+        else:
+            try:
+                info_result.update(output_path=output_path, output_bytes=write_compressed_output(output_path, result_dict))
+            except (IOError, OSError) as ex:
+                return_status = False
+                msg = f"Failed to write the collected information to '{output_path}'. Error: '{ex}'"
+
+    if failed_hosts is not None:
+        if return_status:
+            module.exit_json(return_status=return_status, changed=changed, message=msg, failed_hosts=failed_hosts, **info_result)
+        else:
+            module.fail_json(return_status=return_status, changed=changed, msg=msg, failed_hosts=failed_hosts)
+    elif return_status:
+        if info_result.__len__() > 0:
             module.exit_json(return_status=return_status,
                              changed=changed,
                              message=msg,
-                             nimble_info=result_dict)
+                             **info_result,
+                             **stats)
         else:
             module.exit_json(return_status=return_status, changed=changed, msg=msg)
     else:
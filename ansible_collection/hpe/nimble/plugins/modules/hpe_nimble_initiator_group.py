@@ -102,7 +102,8 @@ extends_documentation_fragment: hpe.nimble.hpe_nimble
 short_description: Manage the HPE Nimble Storage initiator groups
 version_added: "1.0.0"
 notes:
-  - This module does not support C(check_mode).
+  - This module supports C(check_mode) and C(diff_mode). In check mode the changes are computed from the objects already read
+    and returned in C(plan), and nothing is written to the array.
 '''
 
 EXAMPLES = r'''
@@ -131,6 +132,22 @@ EXAMPLES = r'''
 
 '''
 RETURN = r'''
+plan:
+  description:
+    - Writes the task would make, one entry per create, update, delete or action, computed from the objects the module read.
+    - Nothing is sent to the array in check mode.
+  returned: in check mode
+  type: list
+  elements: dict
+  sample: [
+    {
+      "resource": "initiator_groups",
+      "operation": "update",
+      "id": "0275a7cf7bb5c6b6e70000000000000000000000ab",
+      "name": "ig-1",
+      "params": {"description": "updated"}
+    }
+  ]
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -138,7 +155,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -272,13 +288,10 @@ def main():
     default_fields = utils.basic_auth_arg_fields()
     fields.update(default_fields)
     required_if = [('state', 'create', ['access_protocol'])]
-    module = AnsibleModule(argument_spec=fields, required_if=required_if)
+    module = AnsibleModule(argument_spec=fields, required_if=required_if, supports_check_mode=True)
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     state = module.params["state"]
     initiator_group_name = module.params["name"]
     change_name = module.params["change_name"]
@@ -292,7 +305,7 @@ def main():
     app_uuid = module.params["app_uuid"]
     metadata = module.params["metadata"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
 
@@ -301,12 +314,7 @@ def main():
     msg = "No task to run."
     resp = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if state == "create" or state == "present":
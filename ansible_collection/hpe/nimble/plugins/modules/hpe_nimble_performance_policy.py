@@ -102,7 +102,8 @@ extends_documentation_fragment: hpe.nimble.hpe_nimble
 short_description: Manage the HPE Nimble Storage performance policies
 version_added: "1.0.0"
 notes:
-  - This module does not support C(check_mode).
+  - This module supports C(check_mode) and C(diff_mode). In check mode the changes are computed from the objects already read
+    and returned in C(plan), and nothing is written to the array.
 '''
 
 EXAMPLES = r'''
@@ -130,6 +131,22 @@ EXAMPLES = r'''
 
 '''
 RETURN = r'''
+plan:
+  description:
+    - Writes the task would make, one entry per create, update, delete or action, computed from the objects the module read.
+    - Nothing is sent to the array in check mode.
+  returned: in check mode
+  type: list
+  elements: dict
+  sample: [
+    {
+      "resource": "performance_policies",
+      "operation": "update",
+      "id": "0375a7cf7bb5c6b6e700000000000000000000002a",
+      "name": "policy-1",
+      "params": {"compress": false}
+    }
+  ]
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -137,7 +154,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -258,13 +274,10 @@ def main():
     }
     default_fields = utils.basic_auth_arg_fields()
     fields.update(default_fields)
-    module = AnsibleModule(argument_spec=fields)
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     app_category = module.params["app_category"]
     block_size = module.params["block_size"]
     cache = module.params["cache"]
@@ -277,7 +290,7 @@ def main():
     space_policy = module.params["space_policy"]
     state = module.params["state"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Missing variables: hostname, username and password is mandatory.")
 
@@ -286,12 +299,7 @@ def main():
     msg = "No task to run."
     resp = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if state == "create" or state == "present":
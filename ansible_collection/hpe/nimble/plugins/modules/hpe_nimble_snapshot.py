@@ -60,21 +60,45 @@ options:
     type: bool
     description:
     - Forcibly delete the specified snapshot even if it is the last replicated collection. Doing so could lead to full re-seeding at the next replication.
+  folder:
+    required: False
+    type: str
+    description:
+    - Take the snapshot of every volume in this folder, in place of I(volume). Can be combined with I(volume_pattern).
+  max_workers:
+    required: False
+    type: int
+    default: 4
+    description:
+    - Maximum number of snapshots created or deleted at the same time when more than one volume is given.
   metadata:
     required: False
     type: dict
     description:
     - Key-value pairs that augment a snapshot's attributes. List of key-value pairs. Keys must be unique and non-empty.
   name:
-    required: True
+    required: False
     type: str
     description:
-    - Name of the snapshot.
+    - Name of the snapshot. Required unless I(retention) is given.
+    - When more than one volume is given, C({volume}) in the name is replaced with the name of each volume.
   online:
     required: False
     type: bool
     description:
     - Online state for a snapshot means it could be mounted for data restore.
+  retention:
+    required: False
+    type: dict
+    description:
+    - Delete the snapshots of the given volumes that fall out of a retention policy, in place of I(name). Requires state "absent" and is
+      mutually exclusive with I(name).
+    - The policy is a dictionary with the keys C(keep_last), the number of newest snapshots always kept per volume, C(max_age), the age in
+      seconds a snapshot has to reach to be deleted, C(name_pattern), a shell-style pattern limiting the policy to the matching snapshots, and
+      C(rate_limit), the maximum number of snapshots deleted per second. At least one of C(keep_last) and C(max_age) is needed. When both are
+      given, a snapshot is deleted only when it is neither one of the newest C(keep_last) nor younger than C(max_age).
+    - The snapshots of each volume are listed with only the C(id), C(name), C(creation_time) and C(vol_name) attributes, the expired ones are
+      picked in memory and deleted with up to I(max_workers) requests at a time.
   state:
     required: True
     choices:
@@ -85,10 +109,24 @@ options:
     description:
     - The snapshot state.
   volume:
-    required: True
+    required: False
+    type: str
+    description:
+    - Parent volume name. Required when none of I(volumes), I(volume_pattern) and I(folder) is given.
+  volume_pattern:
+    required: False
     type: str
     description:
-    - Parent volume name.
+    - Take the snapshot of every volume whose name matches this shell-style pattern, for example C(db-*), in place of I(volume).
+  volumes:
+    required: False
+    type: list
+    elements: str
+    description:
+    - Names of the volumes to take the snapshot of, in place of I(volume).
+    - With I(volumes), I(volume_pattern) or I(folder) the volumes are resolved with one listing and the snapshots are created or deleted
+      concurrently. With state "present" an existing snapshot is updated as with I(volume), except that I(change_name), I(expiry_after) and
+      I(force) are not applied.
   writable:
     required: False
     type: bool
@@ -125,8 +163,48 @@ EXAMPLES = r'''
     name: "{{ name }}"
     state: absent
 
+- name: Snapshot every database volume before patching
+  hpe.nimble.hpe_nimble_snapshot:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    volume_pattern: "db-*"
+    name: "prepatch-{volume}"
+    description: "taken before patching"
+    max_workers: 8
+    state: present
+
+- name: Keep the last 7 nightly snapshots of each database volume and none older than 30 days
+  hpe.nimble.hpe_nimble_snapshot:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    volume_pattern: "db-*"
+    retention:
+      keep_last: 7
+      max_age: 2592000
+      name_pattern: "nightly-*"
+      rate_limit: 10
+    state: absent
+
 '''
 RETURN = r'''
+snapshots:
+  description:
+    - Result for each volume when more than one volume is given, in the order of I(volumes) or of the volume listing.
+    - With I(retention), the volume, name, id, creation time and result of each deleted snapshot.
+  returned: when volumes, volume_pattern, folder or retention is given
+  type: list
+  elements: dict
+  sample: [
+    {
+      "volume": "db-1",
+      "name": "prepatch-db-1",
+      "return_status": true,
+      "changed": true,
+      "msg": "Snapshot 'prepatch-db-1' created successfully."
+    }
+  ]
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -134,8 +212,14 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
+import threading
+import time
+
+# options of the retention policy
+retention_options = ["keep_last", "max_age", "name_pattern", "rate_limit"]
 
 
 def create_snapshot(
@@ -213,6 +297,208 @@ def delete_snapshot(
         return (False, False, f"Snapshot deletion failed | {ex}", {})
 
 
+def select_batch_volumes(
+        client_obj,
+        volumes=None,
+        volume_pattern=None,
+        folder=None):
+
+    # one listing of the volumes resolves all of them. num_snaps tells which volumes can already have the snapshot
+    vol_list = [vol.attrs for vol in utils.iter_list(client_obj.volumes, detail=True, fields="id,name,folder_id,num_snaps")]
+    if volumes is not None:
+        by_name = dict((vol['name'], vol) for vol in vol_list)
+        return [by_name.get(vol_name, {'name': vol_name}) for vol_name in volumes]
+    folder_id = None
+    if folder is not None:
+        folder_id = utils.get_folder_id(client_obj, folder)
+        if folder_id is None:
+            raise Exception(f"Folder '{folder}' is not present on array.")
+    return [vol for vol in vol_list
+            if (volume_pattern is None or fnmatch.fnmatchcase(vol['name'], volume_pattern)) and (folder_id is None or vol.get('folder_id') == folder_id)]
+
+
+# attributes read for an existing snapshot in batch mode, the ones update_snapshot compares
+batch_snapshot_fields = "id,name,description,online,app_uuid,metadata"
+
+
+def apply_batch_snapshot(
+        client_obj,
+        state,
+        vol,
+        snapshot_name,
+        **kwargs):
+
+    vol_name = vol['name']
+    if vol.get('id') is None:
+        return (False, False, f"Volume '{vol_name}' not present on array.", {})
+    try:
+        snap_list = []
+        if vol.get('num_snaps') != 0:
+            snap_list = client_obj.snapshots.list(detail=True, vol_id=vol['id'], name=snapshot_name, fields=batch_snapshot_fields)
+        if state == "absent":
+            if snap_list.__len__() == 0:
+                return (False, False, f"Snapshot '{snapshot_name}' cannot be deleted as it is not present in given volume '{vol_name}'.", {})
+            client_obj.snapshots.delete(id=snap_list[0].attrs.get("id"))
+            return (True, True, f"Deleted snapshot '{snapshot_name}' successfully.", {})
+        if snap_list.__len__() > 0:
+            if state == "create":
+                return (False, False, f"Snapshot '{snapshot_name}' cannot be created as it is already present in given state.", {})
+            # the attributes the single volume update applies, writable and agent_type can only be set at creation
+            return_status, changed, msg, changed_attrs_dict, resp = update_snapshot(
+                client_obj,
+                snap_list[0],
+                description=kwargs.get('description'),
+                online=kwargs.get('online'),
+                app_uuid=kwargs.get('app_uuid'),
+                metadata=kwargs.get('metadata'))
+            return (return_status, changed, msg, resp)
+        params = utils.remove_null_args(**kwargs)
+        snap_resp = client_obj.snapshots.create(name=snapshot_name, vol_id=vol['id'], **params)
+        return (True, True, f"Snapshot '{snapshot_name}' created successfully.", snap_resp.attrs)
+    except Exception as ex:
+        return (False, False, f"Snapshot operation for volume '{vol_name}' failed | {ex}", {})
+
+
+def batch_snapshots(
+        client_obj,
+        state,
+        snapshot_name,
+        volumes=None,
+        volume_pattern=None,
+        folder=None,
+        max_workers=1,
+        **kwargs):
+
+    if utils.is_null_or_empty(snapshot_name):
+        return (False, False, "Snapshot operation failed as snapshot name is not present.", [])
+    try:
+        vol_list = select_batch_volumes(client_obj, volumes, volume_pattern, folder)
+    except Exception as ex:
+        return (False, False, f"Snapshot operation failed | {ex}", [])
+    if vol_list.__len__() == 0:
+        return (False, False, "No volume matches the given volumes, volume_pattern or folder.", [])
+
+    executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+    try:
+        names = [snapshot_name.replace("{volume}", vol['name']) for vol in vol_list]
+        futures = [executor.submit(apply_batch_snapshot, client_obj, state, vol, name, **kwargs) for vol, name in zip(vol_list, names)]
+        results = [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=True)
+
+    snap_results = []
+    for vol, name, (return_status, changed, msg, resp) in zip(vol_list, names, results):
+        snap_result = dict(volume=vol['name'], name=name, return_status=return_status, changed=changed, msg=msg)
+        if utils.is_null_or_empty(resp) is False:
+            snap_result['attrs'] = resp
+        snap_results.append(snap_result)
+    failed = [snap_result['volume'] for snap_result in snap_results if snap_result['return_status'] is False]
+    changed = any(snap_result['changed'] for snap_result in snap_results)
+    if failed.__len__() > 0:
+        return (False, changed, f"Snapshot operation failed for volume(s) '{', '.join(failed)}'.", snap_results)
+    changed_count = sum(1 for snap_result in snap_results if snap_result['changed'])
+    return (True, changed, f"Applied snapshot to {snap_results.__len__()} volume(s), {changed_count} changed.", snap_results)
+
+
+def parse_retention(retention):
+    for key in retention:
+        if key not in retention_options:
+            raise Exception(f"Invalid retention option '{key}'. Valid options are: {', '.join(retention_options)}.")
+    policy = dict((key, retention.get(key)) for key in retention_options)
+    for key in ('keep_last', 'max_age', 'rate_limit'):
+        if policy[key] is not None:
+            try:
+                policy[key] = float(policy[key]) if key == 'rate_limit' else int(policy[key])
+            except (TypeError, ValueError):
+                raise Exception(f"Invalid value for retention option '{key}'.")
+            if policy[key] < 0:
+                raise Exception(f"Retention option '{key}' cannot be negative.")
+    if policy['keep_last'] is None and policy['max_age'] is None:
+        raise Exception("Retention needs at least one of keep_last and max_age.")
+    return policy
+
+
+def select_expired_snapshots(snap_list, policy, now):
+    # newest first, so that the snapshots kept by keep_last come first
+    candidates = sorted((snap for snap in snap_list
+                         if policy['name_pattern'] is None or fnmatch.fnmatchcase(snap.get('name') or "", policy['name_pattern'])),
+                        key=lambda snap: snap.get('creation_time') or 0, reverse=True)
+    if policy['keep_last'] is not None:
+        candidates = candidates[policy['keep_last']:]
+    if policy['max_age'] is not None:
+        candidates = [snap for snap in candidates if (snap.get('creation_time') or 0) < now - policy['max_age']]
+    return candidates
+
+
+def prune_snapshots(
+        client_obj,
+        retention,
+        vol_name=None,
+        volumes=None,
+        volume_pattern=None,
+        folder=None,
+        max_workers=1):
+
+    try:
+        policy = parse_retention(retention)
+        if vol_name is not None:
+            vol_list = [{'id': utils.get_vol_id(client_obj, vol_name), 'name': vol_name}]
+            if vol_list[0]['id'] is None:
+                raise Exception(f"Volume '{vol_name}' not present on array.")
+        else:
+            vol_list = [vol for vol in select_batch_volumes(client_obj, volumes, volume_pattern, folder) if vol.get('num_snaps') != 0]
+            missing = [vol['name'] for vol in vol_list if vol.get('id') is None]
+            if missing.__len__() > 0:
+                raise Exception(f"Volume(s) '{', '.join(missing)}' not present on array.")
+    except Exception as ex:
+        return (False, False, f"Snapshot retention failed | {ex}", [])
+
+    now = time.time()
+    query = {}
+    if policy['keep_last'] is None:
+        # without a count to keep, the array itself leaves out the snapshots that are too recent
+        query['filter'] = {'operator': 'and', 'criteria': [{'fieldName': 'creation_time', 'operator': 'lessThan', 'value': int(now - policy['max_age'])}]}
+    rate_lock = threading.Lock()
+    next_slot = [now]
+
+    def wait_for_slot():
+        if not policy['rate_limit']:
+            return
+        with rate_lock:
+            slot = max(time.time(), next_slot[0])
+            next_slot[0] = slot + 1.0 / policy['rate_limit']
+        time.sleep(max(slot - time.time(), 0))
+
+    def delete(snap):
+        wait_for_slot()
+        try:
+            client_obj.snapshots.delete(id=snap['id'])
+            return (True, f"Deleted snapshot '{snap['name']}' successfully.")
+        except Exception as ex:
+            return (False, f"Snapshot deletion failed | {ex}")
+
+    executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+    try:
+        snap_lists = executor.map(lambda vol: [snap.attrs for snap in utils.iter_list(client_obj.snapshots, detail=True, vol_id=vol['id'],
+                                                                                      fields="id,name,creation_time,vol_name", **query)], vol_list)
+        expired = [snap for snap_list in snap_lists for snap in select_expired_snapshots(snap_list, policy, now)]
+        results = list(executor.map(delete, expired))
+    except Exception as ex:
+        return (False, False, f"Snapshot retention failed | {ex}", [])
+    finally:
+        executor.shutdown(wait=True)
+
+    pruned = []
+    for snap, (return_status, msg) in zip(expired, results):
+        pruned.append(dict(volume=snap.get('vol_name'), name=snap.get('name'), id=snap.get('id'), creation_time=snap.get('creation_time'),
+                           return_status=return_status, msg=msg))
+    failed = [f"{result['volume']}/{result['name']}" for result in pruned if result['return_status'] is False]
+    changed = pruned.__len__() > failed.__len__()
+    if failed.__len__() > 0:
+        return (False, changed, f"Failed to delete snapshot(s) '{', '.join(failed)}'.", pruned)
+    return (True, changed, f"Deleted {pruned.__len__()} expired snapshot(s) of {vol_list.__len__()} volume(s).", pruned)
+
+
 def main():
 
     fields = {
@@ -229,7 +515,7 @@ def main():
             "type": "str"
         },
         "name": {
-            "required": True,
+            "required": False,
             "type": "str"
         },
         "description": {
@@ -237,9 +523,31 @@ def main():
             "type": "str"
         },
         "volume": {
-            "required": True,
+            "required": False,
             "type": "str"
         },
+        "volumes": {
+            "required": False,
+            "type": "list",
+            "elements": 'str'
+        },
+        "volume_pattern": {
+            "required": False,
+            "type": "str"
+        },
+        "folder": {
+            "required": False,
+            "type": "str"
+        },
+        "max_workers": {
+            "required": False,
+            "type": "int",
+            "default": 4
+        },
+        "retention": {
+            "required": False,
+            "type": "dict"
+        },
         "online": {
             "required": False,
             "type": "bool"
@@ -272,15 +580,14 @@ def main():
     }
     default_fields = utils.basic_auth_arg_fields()
     fields.update(default_fields)
-    required_if = [('state', 'create', ['volume'])]
+    required_one_of = [('volume', 'volumes', 'volume_pattern', 'folder')]
+    mutually_exclusive = [('volume', 'volumes'), ('volume', 'volume_pattern'), ('volume', 'folder'), ('volumes', 'volume_pattern'),
+                          ('volumes', 'folder'), ('name', 'retention')]
 
-    module = AnsibleModule(argument_spec=fields, required_if=required_if)
+    module = AnsibleModule(argument_spec=fields, required_one_of=required_one_of, mutually_exclusive=mutually_exclusive)
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     state = module.params["state"]
     snapshot_name = module.params["name"]
     change_name = module.params["change_name"]
@@ -293,25 +600,54 @@ def main():
     agent_type = module.params["agent_type"]
     expiry_after = module.params["expiry_after"]
     force = module.params["force"]
+    volumes = module.params["volumes"]
+    volume_pattern = module.params["volume_pattern"]
+    folder = module.params["folder"]
+    max_workers = module.params["max_workers"]
+    retention = module.params["retention"]
 
-    if (username is None or password is None or hostname is None or snapshot_name is None):
+    if (utils.is_missing_credentials(module) or (snapshot_name is None and retention is None)):
         module.fail_json(
             msg="Storage system IP or username or password is null or snapshot name is null.")
+    if retention is not None and state != "absent":
+        module.fail_json(msg="Option retention is only supported with state 'absent'.")
 
     # defaults
     return_status = changed = False
     msg = "No task to run."
     resp = None
+    snap_results = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
-        if state == "create" or state == "present":
+        if retention is not None:
+            return_status, changed, msg, snap_results = prune_snapshots(
+                client_obj,
+                retention,
+                vol_name=vol_name,
+                volumes=volumes,
+                volume_pattern=volume_pattern,
+                folder=folder,
+                max_workers=max_workers)
+
+        elif vol_name is None:
+            return_status, changed, msg, snap_results = batch_snapshots(
+                client_obj,
+                state,
+                snapshot_name,
+                volumes=volumes,
+                volume_pattern=volume_pattern,
+                folder=folder,
+                max_workers=max_workers,
+                description=description,
+                online=online,
+                writable=writable,
+                app_uuid=app_uuid,
+                metadata=metadata,
+                agent_type=agent_type)
+
+        elif state == "create" or state == "present":
             snap_resp = client_obj.snapshots.get(id=None, vol_name=vol_name, name=snapshot_name)
             if utils.is_null_or_empty(snap_resp) or state == "create":
                 return_status, changed, msg, changed_attrs_dict, resp = create_snapshot(
@@ -347,7 +683,12 @@ def main():
         # failed for some reason.
         msg = str(ex)
 
-    if return_status:
+    if snap_results is not None:
+        if return_status:
+            module.exit_json(return_status=return_status, changed=changed, msg=msg, snapshots=snap_results)
+        else:
+            module.fail_json(return_status=return_status, changed=changed, msg=msg, snapshots=snap_results)
+    elif return_status:
         if utils.is_null_or_empty(resp):
             module.exit_json(return_status=return_status, changed=changed, msg=msg)
         else:
@@ -162,7 +162,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -311,9 +310,6 @@ def main():
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     state = module.params["state"]
     snapcoll_name = module.params["name"]
     change_name = module.params["change_name"]
@@ -333,7 +329,7 @@ def main():
     expiry_after = module.params["expiry_after"]
     force = module.params["force"]
 
-    if (username is None or password is None or hostname is None or snapcoll_name is None):
+    if (utils.is_missing_credentials(module) or snapcoll_name is None):
         module.fail_json(
             msg="Missing variables: hostname, username, password and snapshot collection name is mandatory.")
 
@@ -342,12 +338,7 @@ def main():
     msg = "No task to run."
     resp = None
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if state == "create" or state == "present":
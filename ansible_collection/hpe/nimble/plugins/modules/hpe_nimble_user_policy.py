@@ -105,7 +105,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -180,9 +179,6 @@ def main():
     if client is None:
         module.fail_json(msg='the python nimble_sdk module is required')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     state = module.params["state"]
     allowed_attempts = module.params["allowed_attempts"]
     min_length = module.params["min_length"]
@@ -194,7 +190,7 @@ def main():
     no_reuse = module.params["no_reuse"]
     max_sessions = module.params["max_sessions"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(
             msg="Storage system IP or username or password is null")
     # defaults
@@ -203,12 +199,7 @@ def main():
     resp = None
 
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States
         if state == "present":
@@ -129,6 +129,12 @@ options:
     type: int
     description:
     - Throughput limit for this volume in MB/s.
+  max_workers:
+    required: False
+    type: int
+    default: 4
+    description:
+    - Maximum number of volumes of I(volumes) created, updated or deleted at the same time.
   metadata:
     required: False
     type: dict
@@ -146,10 +152,10 @@ options:
     description:
     - For iSCSI volume target, this flag indicates whether the volume and its snapshots can be accessed from multiple initiators at the same time.
   name:
-    required: True
+    required: False
     type: str
     description:
-    - Name of the source volume.
+    - Name of the source volume. Either I(name) or I(volumes) is required.
   online:
     required: False
     type: bool
@@ -212,11 +218,25 @@ options:
     description:
     - Name of volume collection of which this volume is a member. Use this attribute in update operation to associate or dissociate volumes with or from
       volume collections. When associating, set this attribute to the name of the volume collection. When dissociating, set this attribute to empty string.
+  volumes:
+    required: False
+    type: list
+    elements: dict
+    description:
+    - List of volumes to manage in a single task, in place of I(name). Each entry needs a name and can carry the options agent_type, app_uuid,
+      block_size, cache_pinned, caching, change_name, dedupe, description, destination, encryption_cipher, folder, force, iscsi_target_scope,
+      limit, limit_iops, limit_mbps, metadata, multi_initiator, online, owned_by_group, perf_policy, pool, read_only, size, state, thinly_provisioned
+      and volcoll. An option left out of an entry is taken from the task, except app_uuid, change_name, destination and force, which can only
+      be given in an entry.
+    - The state of an entry can be "present", "create" or "absent". Cloning, moving and restoring are not supported for a list of volumes.
+    - The existing volumes are read once for the whole list, with only the attributes the module compares, and the pool, performance policy,
+      folder and volume collection names are resolved once.
 extends_documentation_fragment: hpe.nimble.hpe_nimble
 short_description: Manage the HPE Nimble Storage volumes
 version_added: "1.0.0"
 notes:
-  - This module does not support C(check_mode).
+  - This module supports C(check_mode) and C(diff_mode). In check mode the changes are computed from the objects already read
+    and returned in C(plan), and nothing is written to the array.
 '''
 
 EXAMPLES = r'''
@@ -304,8 +324,56 @@ EXAMPLES = r'''
     state: present
     destination: "{{ destination | mandatory }}"
 
+# The options given at the task level apply to every volume of the list that does not set them.
+- name: Create or update many volumes in one task
+  hpe.nimble.hpe_nimble_volume:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    state: present
+    pool: "{{ pool }}"
+    perf_policy: "{{ perf_policy }}"
+    volumes:
+      - name: "{{ name }}-1"
+        size: 1024
+      - name: "{{ name }}-2"
+        size: 2048
+        description: "second volume"
+      - name: "{{ name }}-3"
+        state: absent
+
 '''
 RETURN = r'''
+volumes:
+  description: Result of each entry of I(volumes), in the given order.
+  returned: when volumes is given
+  type: list
+  elements: dict
+  sample: [
+    {
+      "name": "vol-1",
+      "state": "present",
+      "return_status": true,
+      "changed": true,
+      "msg": "Created volume 'vol-1' successfully."
+    }
+  ]
+plan:
+  description:
+    - Writes the task would make, one entry per create, update, delete or action, computed from the objects the module read.
+    - Nothing is sent to the array in check mode.
+  returned: in check mode
+  type: list
+  elements: dict
+  sample: [
+    {
+      "resource": "volumes",
+      "operation": "update",
+      "id": "0675a7cf7bb5c6b6e70000000000000000000000dc",
+      "name": "vol-1",
+      "params": {"size": 2048}
+    }
+  ]
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -314,9 +382,9 @@ try:
     from nimbleclient import exceptions
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
-# from hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
+from ansible.module_utils.common.validation import check_type_bool, check_type_dict, check_type_int, check_type_str
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 
@@ -543,6 +611,204 @@ def clone_volume(
         return (False, False, f"clone volume operation Failed '{ex}'", {}, {})
 
 
+# options an entry of the 'volumes' list can carry. Options left out of an entry are taken from the task itself.
+bulk_volume_options = [
+    "name",
+    "state",
+    "change_name",
+    "size",
+    "description",
+    "perf_policy",
+    "limit",
+    "online",
+    "owned_by_group",
+    "multi_initiator",
+    "iscsi_target_scope",
+    "pool",
+    "read_only",
+    "block_size",
+    "agent_type",
+    "destination",
+    "cache_pinned",
+    "thinly_provisioned",
+    "encryption_cipher",
+    "app_uuid",
+    "folder",
+    "dedupe",
+    "limit_iops",
+    "limit_mbps",
+    "volcoll",
+    "metadata",
+    "force",
+    "caching"
+]
+# attributes read for each existing volume in volumes mode, the ones update_volume compares
+bulk_volume_fields = ("id,name,size,description,perfpolicy_id,limit,online,owned_by_group_id,multi_initiator,iscsi_target_scope,read_only,"
+                      "block_size,volcoll_id,agent_type,cache_pinned,thinly_provisioned,app_uuid,folder_id,metadata,caching_enabled,"
+                      "dedupe_enabled,limit_iops,limit_mbps")
+
+type_checkers = {
+    "bool": check_type_bool,
+    "dict": check_type_dict,
+    "int": check_type_int,
+    "str": check_type_str
+}
+
+
+def parse_bulk_volume(spec, defaults, argument_spec):
+    if isinstance(spec, dict) is False:
+        raise Exception("Each entry of 'volumes' should be provided as dictionary.")
+    vol_spec = dict(defaults)
+    for key, value in spec.items():
+        if key not in bulk_volume_options:
+            raise Exception(f"Invalid option '{key}' provided for volume '{spec.get('name')}'. Valid options are: {', '.join(bulk_volume_options)}.")
+        if value is None:
+            continue
+        try:
+            value = type_checkers[argument_spec[key]['type']](value)
+        except TypeError as ex:
+            raise Exception(f"Invalid value for option '{key}' of volume '{spec.get('name')}'. {ex}")
+        if 'choices' in argument_spec[key] and value not in argument_spec[key]['choices']:
+            raise Exception(f"Option '{key}' of volume '{spec.get('name')}' must be one of: {', '.join(argument_spec[key]['choices'])}.")
+        vol_spec[key] = value
+    if utils.is_null_or_empty(vol_spec['name']):
+        raise Exception("Each entry of 'volumes' should have a name.")
+    if vol_spec['state'] not in ('present', 'create', 'absent'):
+        raise Exception(f"State '{vol_spec['state']}' is not supported for volume '{vol_spec['name']}'. Use 'present', 'create' or 'absent'.")
+    return vol_spec
+
+
+def apply_bulk_volume(client_obj, vol_resp, vol_spec, ids):
+    vol_name = vol_spec['name']
+    try:
+        if vol_spec['state'] == "absent":
+            if utils.is_null_or_empty(vol_resp):
+                return (False, False, f"Volume '{vol_name}' not present to delete.", {}, {})
+            client_obj.volumes.delete(id=vol_resp.attrs.get("id"))
+            return (True, True, f"Deleted volume '{vol_name}' successfully.", {}, {})
+
+        if utils.is_null_or_empty(vol_resp):
+            params = utils.remove_null_args(
+                perfpolicy_id=ids['perf_policy'],
+                size=vol_spec['size'],
+                description=vol_spec['description'],
+                limit=vol_spec['limit'],
+                online=vol_spec['online'],
+                owned_by_group_id=ids['owned_by_group'],
+                multi_initiator=vol_spec['multi_initiator'],
+                iscsi_target_scope=vol_spec['iscsi_target_scope'],
+                pool_id=ids['pool'],
+                read_only=vol_spec['read_only'],
+                block_size=vol_spec['block_size'],
+                agent_type=vol_spec['agent_type'],
+                dest_pool_id=ids['destination'],
+                cache_pinned=vol_spec['cache_pinned'],
+                thinly_provisioned=vol_spec['thinly_provisioned'],
+                encryption_cipher=vol_spec['encryption_cipher'],
+                app_uuid=vol_spec['app_uuid'],
+                folder_id=ids['folder'],
+                metadata=vol_spec['metadata'],
+                dedupe_enabled=vol_spec['dedupe'],
+                limit_iops=vol_spec['limit_iops'],
+                limit_mbps=vol_spec['limit_mbps'])
+            resp = client_obj.volumes.create(vol_name, **params)
+            return (True, True, f"Created volume '{vol_name}' successfully.", {}, resp.attrs)
+        if vol_spec['state'] == "create":
+            return (False, False, f"Volume '{vol_name}' cannot be created as it is already present in given state.", {}, {})
+        return update_volume(
+            client_obj,
+            vol_resp,
+            name=vol_spec['change_name'],
+            volcoll_name=vol_spec['volcoll'],
+            size=vol_spec['size'],
+            description=vol_spec['description'],
+            perfpolicy_id=ids['perf_policy'],
+            limit=vol_spec['limit'],
+            online=vol_spec['online'],
+            owned_by_group_id=ids['owned_by_group'],
+            multi_initiator=vol_spec['multi_initiator'],
+            iscsi_target_scope=vol_spec['iscsi_target_scope'],
+            read_only=vol_spec['read_only'],
+            block_size=vol_spec['block_size'],
+            volcoll_id=ids['volcoll'],
+            agent_type=vol_spec['agent_type'],
+            force=vol_spec['force'],
+            cache_pinned=vol_spec['cache_pinned'],
+            thinly_provisioned=vol_spec['thinly_provisioned'],
+            app_uuid=vol_spec['app_uuid'],
+            folder_id=ids['folder'],
+            metadata=vol_spec['metadata'],
+            caching_enabled=vol_spec['caching'],
+            dedupe_enabled=vol_spec['dedupe'],
+            limit_iops=vol_spec['limit_iops'],
+            limit_mbps=vol_spec['limit_mbps'])
+    except Exception as ex:
+        return (False, False, f"Volume operation for '{vol_name}' failed '{ex}'", {}, {})
+
+
+def bulk_volumes(
+        client_obj,
+        volumes,
+        defaults,
+        argument_spec,
+        max_workers=1):
+
+    if utils.is_null_or_empty(volumes):
+        return (False, False, "Please provide atleast one volume.", [])
+    # the collections the shared names live in, with the helper that resolves one name
+    resolvers = {
+        "perf_policy": ("performance_policies", utils.get_perfpolicy_id),
+        "owned_by_group": ("groups", utils.get_owned_by_group_id),
+        "pool": ("pools", utils.get_pool_id),
+        "destination": ("pools", utils.get_pool_id),
+        "folder": ("folders", utils.get_folder_id),
+        "volcoll": ("volume_collections", utils.get_volcoll_id)
+    }
+    try:
+        vol_specs = [parse_bulk_volume(spec, defaults, argument_spec) for spec in volumes]
+        names = [vol_spec['name'] for vol_spec in vol_specs]
+        repeated = sorted(set(name for name in names if names.count(name) > 1))
+        if repeated.__len__() > 0:
+            raise Exception(f"Volume(s) '{', '.join(repeated)}' provided more than once. Please remove the duplicate entries.")
+
+        # one listing of each referenced collection resolves all the names shared by the volumes
+        resolver = utils.get_name_resolver(client_obj)
+        for collection in set(resolvers[key][0] for key in resolvers for vol_spec in vol_specs if not utils.is_null_or_empty(vol_spec[key])):
+            resolver.prefetch(collection)
+        # and a single listing of the volumes tells which volumes to create, update or delete
+        existing = dict((vol.attrs.get('name'), vol) for vol in utils.iter_list(client_obj.volumes, detail=True, fields=bulk_volume_fields))
+    except Exception as ex:
+        return (False, False, f"{ex}", [])
+
+    results = [None] * vol_specs.__len__()
+    pending = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for index, vol_spec in enumerate(vol_specs):
+            try:
+                ids = dict((key, resolve(client_obj, vol_spec[key])) for key, (collection, resolve) in resolvers.items())
+            except Exception as ex:
+                results[index] = (False, False, f"{ex}", {}, {})
+                continue
+            pending[executor.submit(apply_bulk_volume, client_obj, existing.get(vol_spec['name']), vol_spec, ids)] = index
+        for future, index in pending.items():
+            results[index] = future.result()
+    finally:
+        executor.shutdown(wait=True)
+
+    vol_results = []
+    for vol_spec, (return_status, changed, msg, changed_attrs_dict, resp) in zip(vol_specs, results):
+        vol_result = dict(name=vol_spec['name'], state=vol_spec['state'], return_status=return_status, changed=changed, msg=msg)
+        if utils.is_null_or_empty(resp) is False:
+            vol_result['attrs'] = resp
+        vol_results.append(vol_result)
+    failed = [vol_result['name'] for vol_result in vol_results if vol_result['return_status'] is False]
+    changed = any(vol_result['changed'] for vol_result in vol_results)
+    if failed.__len__() > 0:
+        return (False, changed, f"Failed to apply volume(s) '{', '.join(failed)}'.", vol_results)
+    return (True, changed, f"Applied {vol_results.__len__()} volume(s), {sum(1 for vol_result in vol_results if vol_result['changed'])} changed.", vol_results)
+
+
 def main():
 
     fields = {
@@ -556,7 +822,7 @@ def main():
             "type": "str"
         },
         "name": {
-            "required": True,
+            "required": False,
             "type": "str"
         },
         "change_name": {
@@ -685,13 +951,28 @@ def main():
         "move": {
             "required": False,
             "type": "bool"
+        },
+        "volumes": {
+            "required": False,
+            "type": "list",
+            "elements": 'dict'
+        },
+        "max_workers": {
+            "required": False,
+            "type": "int",
+            "default": 4
         }
     }
     default_fields = utils.basic_auth_arg_fields()
     fields.update(default_fields)
     required_if = [('state', 'restore', ['snapshot'])]
+    required_one_of = [('name', 'volumes')]
+    # the options which only make sense for one volume are not taken from the task for every entry of volumes
+    mutually_exclusive = [('name', 'volumes'), ('volumes', 'parent'), ('volumes', 'move'), ('volumes', 'clone'), ('volumes', 'change_name'),
+                          ('volumes', 'destination'), ('volumes', 'app_uuid'), ('volumes', 'force')]
 
-    module = AnsibleModule(argument_spec=fields, required_if=required_if)
+    module = AnsibleModule(argument_spec=fields, required_if=required_if, required_one_of=required_one_of, mutually_exclusive=mutually_exclusive,
+                           supports_check_mode=True)
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
@@ -728,26 +1009,27 @@ def main():
     caching = module.params["caching"]
     force_vvol = module.params["force_vvol"]
     move = module.params["move"]
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
+    volumes = module.params["volumes"]
+    max_workers = module.params["max_workers"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(msg="Missing variables: hostname, username and password is mandatory.")
+    if max_workers < 1:
+        module.fail_json(msg="Parameter 'max_workers' should be greater than zero.")
     # defaults
     return_status = changed = False
     msg = "No task to run."
     resp = None
+    vol_results = None
 
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
         # States
-        if move is True and state == "present":
+        if volumes is not None:
+            defaults = dict((key, module.params[key]) for key in bulk_volume_options)
+            return_status, changed, msg, vol_results = bulk_volumes(client_obj, volumes, defaults, fields, max_workers)
+
+        elif move is True and state == "present":
             if utils.is_null_or_empty(dest_pool) is False:
                 return_status, changed, msg, changed_attrs_dict, resp = move_volume(client_obj, vol_name, dest_pool, force_vvol)
             else:
@@ -830,7 +1112,12 @@ def main():
         # failed for some reason.
         msg = str(ex)
 
-    if return_status:
+    if vol_results is not None:
+        if return_status:
+            module.exit_json(return_status=return_status, changed=changed, msg=msg, volumes=vol_results)
+        else:
+            module.fail_json(return_status=return_status, changed=changed, msg=msg, volumes=vol_results)
+    elif return_status:
         if utils.is_null_or_empty(resp):
             module.exit_json(return_status=return_status, changed=changed, msg=msg)
         else:
@@ -208,7 +208,8 @@ extends_documentation_fragment: hpe.nimble.hpe_nimble
 short_description: Manage the HPE Nimble Storage volume collections
 version_added: "1.0.0"
 notes:
-  - This module does not support C(check_mode).
+  - This module supports C(check_mode) and C(diff_mode). In check mode the changes are computed from the objects already read
+    and returned in C(plan), and nothing is written to the array.
 '''
 
 EXAMPLES = r'''
@@ -279,6 +280,22 @@ EXAMPLES = r'''
 
 '''
 RETURN = r'''
+plan:
+  description:
+    - Writes the task would make, one entry per create, update, delete or action, computed from the objects the module read.
+    - Nothing is sent to the array in check mode.
+  returned: in check mode
+  type: list
+  elements: dict
+  sample: [
+    {
+      "resource": "volume_collections",
+      "operation": "update",
+      "id": "0775a7cf7bb5c6b6e7000000000000000000000005",
+      "name": "volcoll-1",
+      "params": {"description": "updated"}
+    }
+  ]
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -286,7 +303,6 @@ try:
     from nimbleclient.v1 import client
 except ImportError:
     client = None
-from ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble import __version__ as NIMBLE_ANSIBLE_VERSION
 import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils
 
 
@@ -567,13 +583,10 @@ def main():
     }
     default_fields = utils.basic_auth_arg_fields()
     fields.update(default_fields)
-    module = AnsibleModule(argument_spec=fields)
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
     if client is None:
         module.fail_json(msg='Python nimble-sdk could not be found.')
 
-    hostname = module.params["host"]
-    username = module.params["username"]
-    password = module.params["password"]
     state = module.params["state"]
     prot_template = module.params["prot_template"]
     volcoll_name = module.params["name"]
@@ -603,7 +616,7 @@ def main():
     no_reverse = module.params["no_reverse"]
     override_upstream_down = module.params["override_upstream_down"]
 
-    if (username is None or password is None or hostname is None):
+    if utils.is_missing_credentials(module):
         module.fail_json(msg="Missing variables: hostname, username and password is mandatory.")
 
     # defaults
@@ -612,12 +625,7 @@ def main():
     resp = None
 
     try:
-        client_obj = client.NimOSClient(
-            hostname,
-            username,
-            password,
-            f"HPE Nimble Ansible Modules v{NIMBLE_ANSIBLE_VERSION}"
-        )
+        client_obj = utils.get_nimos_client(module)
 
         # States.
         if state == 'present' and promote is True:
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+# Copyright 2020 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this
+# file except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS
+# OF ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+# author Alok Ranjan (alok.ranjan2@hpe.com)
+
+"""Runs the entry functions of the modules against MockNimOS and reports what each operation costs.
+
+Every scenario gets a fresh mock group and a fresh client, and is measured in wall time, number of requests, logins and
+bytes sent and received. Needs ansible-core and nimble-sdk, the collection is imported from this source tree.
+
+By default the client is a NimOSHttpApiClient calling the mock in process, as with the httpapi connection. With
+--transport sdk the mock is served over HTTPS on localhost and the client is the nimble-sdk NimOSClient, as with the
+default connection, so the cost of the requests library, TLS and the logins is measured too.
+
+    python3 test/hpe/nimble/bench/bench_nimble.py --volumes 10000 --snapshots 100000 --latency 0.002
+    python3 test/hpe/nimble/bench/bench_nimble.py --scenario info_minimum --scenario volume_bulk --json /tmp/bench.json
+    python3 test/hpe/nimble/bench/bench_nimble.py --transport sdk --session-cache --scenario task_logins
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import urllib3
+
+from mock_nimos import MockNimOS, MockNimOSServer
+
+COLLECTION_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'ansible_collection', 'hpe', 'nimble'))
+
+
+def import_collection():
+    # the collection is laid out as ansible_collection/hpe/nimble in the repo, expose it as ansible_collections.hpe.nimble. The
+    # directory is removed when the returned object is collected, at the latest on exit
+    root = tempfile.TemporaryDirectory(prefix="hpe_nimble_bench_")
+    os.makedirs(os.path.join(root.name, 'ansible_collections', 'hpe'))
+    os.symlink(COLLECTION_PATH, os.path.join(root.name, 'ansible_collections', 'hpe', 'nimble'))
+    sys.path.insert(0, root.name)
+    return root
+
+
+COLLECTION_ROOT = import_collection()
+
+import ansible_collections.hpe.nimble.plugins.module_utils.hpe_nimble as utils  # noqa: E402
+from ansible_collections.hpe.nimble.plugins.modules import hpe_nimble_group  # noqa: E402
+from ansible_collections.hpe.nimble.plugins.modules import hpe_nimble_info  # noqa: E402
+from ansible_collections.hpe.nimble.plugins.modules import hpe_nimble_snapshot  # noqa: E402
+from ansible_collections.hpe.nimble.plugins.modules import hpe_nimble_volume  # noqa: E402
+
+BULK_VOLUMES = 100
+TASKS = 10
+
+
+def info_minimum(client_obj, args):
+    return hpe_nimble_info.get_subset_info(client_obj, ['minimum'], args.max_workers)
+
+
+def info_config(client_obj, args):
+    return hpe_nimble_info.get_subset_info(client_obj, ['config'], args.max_workers)
+
+
+def info_volumes(client_obj, args):
+    return hpe_nimble_info.get_subset_info(client_obj, [{'volumes': {'fields': ['id', 'name', 'size']}}], args.max_workers)
+
+
+def info_all(client_obj, args):
+    return hpe_nimble_info.get_subset_info(client_obj, [{'all': {'limit': 100}}], args.max_workers)
+
+
+def volume_create(client_obj, args):
+    return hpe_nimble_volume.create_volume(client_obj, "bench-vol",
+                                           size=1024,
+                                           pool_id=utils.get_pool_id(client_obj, "default"),
+                                           perfpolicy_id=utils.get_perfpolicy_id(client_obj, "default"))
+
+
+def volume_update(client_obj, args):
+    vol_resp = client_obj.volumes.get(id=None, name="vol-1")
+    return hpe_nimble_volume.update_volume(client_obj, vol_resp,
+                                           description="updated by bench",
+                                           perfpolicy_id=utils.get_perfpolicy_id(client_obj, "default"),
+                                           folder_id=utils.get_folder_id(client_obj, None))
+
+
+def volume_bulk(client_obj, args):
+    defaults = dict((key, None) for key in hpe_nimble_volume.bulk_volume_options)
+    defaults.update(state="present", pool="default", perf_policy="default", size=1024)
+    volumes = [{'name': f"bench-vol-{index}"} for index in range(BULK_VOLUMES)]
+    argument_spec = {'name': {'type': 'str'}, 'state': {'type': 'str'}, 'size': {'type': 'int'}}
+    return hpe_nimble_volume.bulk_volumes(client_obj, volumes, defaults, argument_spec, args.max_workers)
+
+
+def snapshot_create(client_obj, args):
+    return hpe_nimble_snapshot.create_snapshot(client_obj, "vol-1", "bench-snap", description="created by bench")
+
+
+def group_update(client_obj, args):
+    return hpe_nimble_group.update_group(client_obj, "group-mock", ntp_server="pool.ntp.org", smtp_port=25)
+
+
+def name_lookups(client_obj, args):
+    for index in range(BULK_VOLUMES):
+        utils.get_vol_id(client_obj, f"vol-{index % 10}")
+        utils.get_pool_id(client_obj, "default")
+    return (True, False, "", {})
+
+
+def task_logins(client_obj, args):
+    # every task of a play runs in a new process, which starts without the sessions of the sdk session manager
+    for index in range(TASKS):
+        utils.SessionManager._SESSIONS.clear()
+        task_client = connect_sdk(client_obj._client.port, args)
+        task_client.groups.get(id=None, name="group-mock")
+    return (True, False, "", {})
+
+
+SCENARIOS = [
+    info_minimum,
+    info_config,
+    info_volumes,
+    info_all,
+    volume_create,
+    volume_update,
+    volume_bulk,
+    snapshot_create,
+    group_update,
+    name_lookups,
+    task_logins
+]
+
+# scenarios which need a client connecting over the network
+SDK_SCENARIOS = [task_logins]
+
+
+def connect_sdk(port, args):
+    # as utils.connect_nimos_host, against the port of the mock server
+    app_name = "HPE Nimble Ansible Modules bench"
+    if args.session_cache is True:
+        session_cache = utils.NimOSSessionCache(os.path.join(args.session_cache_dir, "session_cache.json"), utils.DEFAULT_SESSION_CACHE_TTL)
+        return session_cache.get_client("127.0.0.1", "admin", "admin", app_name, port=port)
+    return utils.client.NimOSClient("127.0.0.1", "admin", "admin", app_name, port=port)
+
+
+def run_scenario(scenario, args):
+    group = MockNimOS(volumes=args.volumes, snapshots=args.snapshots, latency=args.latency, bandwidth=args.bandwidth)
+    if args.transport == "sdk":
+        with MockNimOSServer(group) as server:
+            utils.SessionManager._SESSIONS.clear()
+            start = time.time()
+            result = scenario(connect_sdk(server.port, args), args)
+            wall_time = time.time() - start
+    else:
+        client_obj = utils.NimOSHttpApiClient(group)
+        start = time.time()
+        result = scenario(client_obj, args)
+        wall_time = time.time() - start
+    stats = group.stats()
+    stats['logins'] = [call for call in group.calls if call['method'] == 'POST' and call['path'].strip('/') == 'v1/tokens'].__len__()
+    return dict(scenario=scenario.__name__,
+                ok=result[0] is True,
+                wall_time=round(wall_time, 4),
+                msg=result[2] if result[0] is not True else "",
+                **stats)
+
+
+def print_report(results):
+    header = f"{'scenario':<18}{'wall (s)':>10}{'requests':>10}{'logins':>8}{'sent (B)':>12}{'received (B)':>14}  status"
+    print(header)
+    print('-' * header.__len__())
+    for result in results:
+        status = "ok" if result['ok'] is True else f"FAILED {result['msg']}"
+        print(f"{result['scenario']:<18}{result['wall_time']:>10.3f}{result['requests']:>10}{result['logins']:>8}"
+              f"{result['bytes_sent']:>12}{result['bytes_received']:>14}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hpe.nimble modules against a NimOS REST stand-in.")
+    parser.add_argument('--volumes', type=int, default=1000, help="volumes in the mock group")
+    parser.add_argument('--snapshots', type=int, default=10000, help="snapshots in the mock group, spread over the volumes")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds slept on every request")
+    parser.add_argument('--bandwidth', type=int, default=None, help="bytes per second, adds the transfer time of every request")
+    parser.add_argument('--max-workers', type=int, default=4, help="max_workers passed to the modules that support it")
+    parser.add_argument('--scenario', action='append', choices=[scenario.__name__ for scenario in SCENARIOS], help="scenario to run, all by default")
+    parser.add_argument('--transport', choices=["httpapi", "sdk"], default="httpapi",
+                        help="httpapi calls the mock in process, sdk serves it over HTTPS to the nimble-sdk client")
+    parser.add_argument('--session-cache', action='store_true', help="with --transport sdk, connect through the session cache")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+    if args.transport == "sdk":
+        # the mock server certificate is self-signed, the sdk does not verify it
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    options = dict(vars(args))
+
+    scenarios = [scenario for scenario in SCENARIOS if args.scenario is None or scenario.__name__ in args.scenario]
+    if args.transport != "sdk":
+        scenarios = [scenario for scenario in scenarios if scenario not in SDK_SCENARIOS]
+    with tempfile.TemporaryDirectory(prefix="hpe_nimble_bench_cache_") as session_cache_dir:
+        args.session_cache_dir = session_cache_dir
+        results = [run_scenario(scenario, args) for scenario in scenarios]
+    print_report(results)
+    if args.json is not None:
+        with open(args.json, 'w') as json_file:
+            json.dump({'options': options, 'results': results}, json_file, indent=2)
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
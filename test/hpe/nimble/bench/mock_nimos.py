@@ -0,0 +1,409 @@
+# Copyright 2020 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this
+# file except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS
+# OF ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+# author Alok Ranjan (alok.ranjan2@hpe.com)
+
+"""In-process stand-in for the NimOS v1 REST API.
+
+MockNimOS keeps the objects of a group in memory and answers the requests the collection sends, with the paging, field
+projection, query and advanced criteria behaviour of NimOS. It has the send_request(data, path, method) interface of the
+hpe.nimble.nimble httpapi plugin, so a NimOSHttpApiClient built over it runs the module code unchanged. Every request
+is recorded with its size, which is what the benchmarks report.
+
+MockNimOSServer serves a MockNimOS over HTTPS on localhost, for the requests made by the nimble-sdk NimOSClient, which
+is what the modules use when they are not run over the httpapi connection.
+"""
+
+import datetime
+import json
+import os
+import shutil
+import ssl
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# query parameters which are not an attribute filter
+RESERVED_PARAMS = ['fields', 'pageSize', 'startRow', 'operationType']
+
+# attribute holding the modification time of the object types which do not name it last_modified
+MODIFIED_FIELD = {
+    "volume_collections": "last_modified_time"
+}
+
+# id prefix of each object type, NimOS ids are 42 hex digits
+ID_PREFIX = {
+    "arrays": "09",
+    "folders": "2f",
+    "groups": "00",
+    "initiator_groups": "02",
+    "performance_policies": "03",
+    "pools": "0a",
+    "protection_schedules": "0c",
+    "protection_templates": "12",
+    "snapshot_collections": "05",
+    "snapshots": "04",
+    "users": "18",
+    "volume_collections": "07",
+    "volumes": "06"
+}
+
+CRITERIA_OPERATORS = {
+    "equals": lambda value, expected: value == expected,
+    "notEqual": lambda value, expected: value != expected,
+    "greaterThan": lambda value, expected: value is not None and value > expected,
+    "greaterOrEqual": lambda value, expected: value is not None and value >= expected,
+    "lessThan": lambda value, expected: value is not None and value < expected,
+    "lessOrEqual": lambda value, expected: value is not None and value <= expected,
+    "inSet": lambda value, expected: value in expected,
+    "notInSet": lambda value, expected: value not in expected,
+    "iContains": lambda value, expected: value is not None and str(expected).lower() in str(value).lower(),
+    "iStartsWith": lambda value, expected: value is not None and str(value).lower().startswith(str(expected).lower())
+}
+
+
+class MockNimOSError(Exception):
+
+    def __init__(self, status, code, text):
+        super(MockNimOSError, self).__init__(text)
+        self.status = status
+        self.code = code
+        self.text = text
+
+
+class MockNimOS(object):
+    """A NimOS group held in memory.
+
+    volumes and snapshots set how many objects are created up front, the snapshots being spread evenly over the volumes.
+    latency is slept on every request and bandwidth, in bytes per second, adds the transfer time of the response.
+    """
+
+    def __init__(self, volumes=100, snapshots=0, latency=0.0, bandwidth=None, page_size=1024, version="5.2.1.0-919013-opt"):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.page_size = page_size
+        self.version = version
+        self.calls = []
+        self._objects = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._seed(volumes, snapshots)
+
+    # the state of the group
+
+    def _new_id(self, collection):
+        self._next_id += 1
+        return f"{ID_PREFIX.get(collection, '99')}{self._next_id:040x}"
+
+    def _add(self, collection, **attrs):
+        now = int(time.time())
+        record = {'id': self._new_id(collection), 'creation_time': now, MODIFIED_FIELD.get(collection, 'last_modified'): now}
+        record.update(attrs)
+        self._objects.setdefault(collection, {})[record['id']] = record
+        return record
+
+    def _seed(self, volumes, snapshots):
+        group = self._add("groups", name="group-mock", version_current=self.version.split('-')[0], num_snaps=0, ntp_server="time.nimblestorage.com",
+                          smtp_server="", smtp_port=25, alarms_enabled=True, autosupport_enabled=True, iscsi_enabled=True, fc_enabled=False,
+                          leader_array_name="array-mock", default_iscsi_target_scope="group", encryption_config={}, member_list=["array-mock"])
+        self._add("arrays", name="array-mock", full_name="array-mock", version=self.version, extended_model="vmware-4G-5T-160F",
+                  all_flash=False, serial="array-mock", role="leader")
+        pool = self._add("pools", name="default", is_default=True, array_count=1, dedupe_capable=False, dedupe_all_volumes=False, vol_list=[])
+        policy = self._add("performance_policies", name="default", block_size=4096, compress=True, cache=True)
+        self._add("software_versions", name="installed", version=self.version.split('-')[0], status="installed")
+        for collection in ["folders", "initiator_groups", "protection_schedules", "protection_templates", "snapshot_collections", "users",
+                           "volume_collections"]:
+            self._add(collection, name=f"{collection}-1")
+        self._add("network_configs", name="active", role="active", mgmt_ip="10.0.0.10", group_leader_array="array-mock", array_list=[],
+                  subnet_list=[], route_list=[], iscsi_automatic_connection_method=True, iscsi_connection_rebalancing=True)
+        # the remaining object sets start out empty
+        for collection in ["access_control_records", "alarms", "application_categories", "application_servers", "chap_users", "controllers",
+                           "disks", "fibre_channel_configs", "fibre_channel_initiator_aliases", "fibre_channel_interfaces", "fibre_channel_ports",
+                           "initiators", "master_key", "network_interfaces", "protocol_endpoints", "replication_partners", "shelves", "user_groups",
+                           "user_policies"]:
+            self._objects.setdefault(collection, {})
+
+        vol_ids = []
+        for index in range(volumes):
+            volume = self._add("volumes", name=f"vol-{index}", size=1024 * (index % 100 + 1), description="", online=True,
+                               pool_id=pool['id'], pool_name=pool['name'], perfpolicy_id=policy['id'], perfpolicy_name=policy['name'],
+                               num_snaps=0, limit=100, read_only=False, block_size=4096, thinly_provisioned=True, dedupe_enabled=False,
+                               limit_iops=-1, limit_mbps=-1, agent_type="none", iscsi_target_scope="volume", multi_initiator=False,
+                               cache_pinned=False, caching_enabled=True, encryption_cipher="none", metadata=[], folder_id="",
+                               volcoll_id="", volcoll_name="", vol_state="online", serial_number=uuid.uuid4().hex,
+                               target_name=f"iqn.2007-11.com.nimblestorage:vol-{index}")
+            vol_ids.append(volume['id'])
+        for index in range(snapshots if vol_ids else 0):
+            volume = self._objects["volumes"][vol_ids[index % vol_ids.__len__()]]
+            self._add("snapshots", name=f"snap-{index // vol_ids.__len__()}", vol_id=volume['id'], vol_name=volume['name'], size=volume['size'],
+                      description="", online=False, writable=False, schedule_name="", snap_collection_name="", is_replica=False,
+                      expiry_time=0, new_data_valid=True, origin_name="", metadata=[])
+            volume['num_snaps'] += 1
+        group['num_snaps'] = self._objects.get("snapshots", {}).__len__()
+
+    def objects(self, collection):
+        return list(self._objects.get(collection, {}).values())
+
+    # the transport used by NimOSHttpApiClient
+
+    def send_request(self, data, path, method='GET'):
+        body = json.dumps(data) if data is not None else ""
+        start = time.time()
+        try:
+            with self._lock:
+                status, response = self._dispatch(method, path, data)
+        except MockNimOSError as ex:
+            status, response = ex.status, {'messages': [{'code': ex.code, 'severity': "error", 'text': ex.text}]}
+        response_body = json.dumps(response)
+        delay = self.latency
+        if self.bandwidth:
+            delay += (body.__len__() + response_body.__len__()) / float(self.bandwidth)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.calls.append({
+                'method': method,
+                'path': path,
+                'status': status,
+                'bytes_sent': body.__len__(),
+                'bytes_received': response_body.__len__(),
+                'latency': time.time() - start
+            })
+        return status, json.loads(response_body)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.calls.__len__(),
+                'bytes_sent': sum(call['bytes_sent'] for call in self.calls),
+                'bytes_received': sum(call['bytes_received'] for call in self.calls)
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = []
+
+    # request handling
+
+    def _dispatch(self, method, path, data):
+        url = urlsplit(path)
+        params = dict(parse_qsl(url.query))
+        parts = url.path.strip('/').split('/')
+        if parts.__len__() < 2 or parts[0] != 'v1':
+            raise MockNimOSError(404, "SM_http_not_found", f"Invalid path '{url.path}'.")
+        collection = parts[1]
+        if collection == "tokens":
+            return self._tokens(method, data)
+        if collection not in self._objects:
+            raise MockNimOSError(404, "SM_http_not_found", f"Object set '{collection}' is not supported.")
+
+        if parts.__len__() == 2 or (parts.__len__() == 3 and parts[2] == 'detail'):
+            detail = parts.__len__() == 3
+            if method == 'GET':
+                return self._list(collection, detail, params, None)
+            if method == 'POST' and isinstance(data, dict) and data.get('operationType') == 'fetch':
+                return self._list(collection, detail, params, data.get('data'))
+            if method == 'POST' and detail is False:
+                return self._create(collection, (data or {}).get('data', {}))
+        elif parts.__len__() == 3:
+            record = self._get(collection, parts[2])
+            if method == 'GET':
+                return 200, {'data': self._project(record, params.get('fields'))}
+            if method == 'PUT':
+                return self._update(collection, record, (data or {}).get('data', {}))
+            if method == 'DELETE':
+                return self._delete(collection, record)
+        elif parts.__len__() == 5 and parts[3] == 'actions' and method == 'POST':
+            return self._action(collection, self._get(collection, parts[2]), parts[4], (data or {}).get('data', {}))
+        raise MockNimOSError(405, "SM_http_method_not_allowed", f"{method} is not supported on '{url.path}'.")
+
+    def _tokens(self, method, data):
+        if method == 'POST':
+            return 201, {'data': {'id': uuid.uuid4().hex, 'session_token': uuid.uuid4().hex, 'username': (data or {}).get('data', {}).get('username')}}
+        return 200, {}
+
+    def _get(self, collection, ident):
+        record = self._objects[collection].get(ident)
+        if record is None:
+            raise MockNimOSError(404, "SM_http_not_found", f"Object '{ident}' not found in '{collection}'.")
+        return record
+
+    def _project(self, record, fields):
+        if fields is None:
+            return dict(record)
+        return dict((key, record.get(key)) for key in fields.split(','))
+
+    def _list(self, collection, detail, params, criteria):
+        records = self.objects(collection)
+        filters = dict((key, value) for key, value in params.items() if key not in RESERVED_PARAMS)
+        if collection == "snapshots" and criteria is None and 'vol_id' not in filters and 'vol_name' not in filters and 'id' not in filters:
+            raise MockNimOSError(400, "SM_missing_arg", "Missing argument: vol_id or vol_name.")
+        for key, value in filters.items():
+            records = [record for record in records if str(record.get(key)).lower() == value.lower() or str(record.get(key)) == value]
+        if criteria is not None:
+            records = [record for record in records if self._matches(record, criteria)]
+
+        total = records.__len__()
+        start = int(params.get('startRow', 0))
+        size = min(int(params.get('pageSize', self.page_size)), self.page_size)
+        page = records[start:start + size]
+        if detail is True or 'fields' in params:
+            page = [self._project(record, params.get('fields')) for record in page]
+        else:
+            page = [{'id': record['id'], 'name': record.get('name')} for record in page]
+        return 200, {'startRow': start, 'endRow': start + page.__len__(), 'totalRows': total, 'data': page}
+
+    def _matches(self, record, criteria):
+        if 'criteria' in criteria:
+            results = [self._matches(record, item) for item in criteria['criteria']]
+            if criteria.get('operator') == 'or':
+                return any(results)
+            if criteria.get('operator') == 'not':
+                return not any(results)
+            return all(results)
+        operator = CRITERIA_OPERATORS.get(criteria.get('operator'))
+        if operator is None:
+            raise MockNimOSError(400, "SM_invalid_arg_value", f"Invalid criteria operator '{criteria.get('operator')}'.")
+        return operator(record.get(criteria.get('fieldName')), criteria.get('value'))
+
+    def _create(self, collection, attrs):
+        name = attrs.get('name')
+        if name is not None and any(record.get('name') == name and record.get('vol_id') == attrs.get('vol_id')
+                                    for record in self._objects[collection].values()):
+            raise MockNimOSError(409, "SM_eexist", f"Object '{name}' already exists.")
+        if collection == "snapshots":
+            volume = self._get("volumes", attrs.get('vol_id'))
+            attrs = dict(attrs, vol_name=volume['name'], size=volume['size'])
+            volume['num_snaps'] += 1
+            self._objects["groups"][next(iter(self._objects["groups"]))]['num_snaps'] += 1
+        record = self._add(collection, **self._to_attrs(attrs))
+        return 201, {'data': dict(record)}
+
+    def _update(self, collection, record, attrs):
+        if 'name' in attrs and any(other.get('name') == attrs['name'] and other['id'] != record['id']
+                                   for other in self._objects[collection].values()):
+            raise MockNimOSError(409, "SM_eexist", f"Object '{attrs['name']}' already exists.")
+        record.update(self._to_attrs(attrs))
+        record[MODIFIED_FIELD.get(collection, 'last_modified')] = int(time.time())
+        return 200, {'data': dict(record)}
+
+    def _delete(self, collection, record):
+        if collection == "volumes":
+            if record.get('online') is True:
+                raise MockNimOSError(409, "SM_http_conflict", f"Volume '{record['name']}' is online.")
+            for snapshot in [snap for snap in self.objects("snapshots") if snap.get('vol_id') == record['id']]:
+                self._delete("snapshots", snapshot)
+        if collection == "snapshots" and record.get('vol_id') in self._objects.get("volumes", {}):
+            self._objects["volumes"][record['vol_id']]['num_snaps'] -= 1
+            self._objects["groups"][next(iter(self._objects["groups"]))]['num_snaps'] -= 1
+        del self._objects[collection][record['id']]
+        return 200, {}
+
+    def _action(self, collection, record, action, attrs):
+        if action in ("online", "offline"):
+            record['online'] = action == "online"
+            record[MODIFIED_FIELD.get(collection, 'last_modified')] = int(time.time())
+        return 200, {'data': dict(record)}
+
+    def _to_attrs(self, attrs):
+        attrs = dict(attrs)
+        if isinstance(attrs.get('metadata'), dict):
+            attrs['metadata'] = [{'key': key, 'value': value} for key, value in attrs['metadata'].items()]
+        return attrs
+
+
+class MockNimOSRequestHandler(BaseHTTPRequestHandler):
+    # the sdk reuses its connections, hence keep them open
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length > 0 else b""
+        data = json.loads(body) if body else None
+        status, response = self.server.group.send_request(data, self.path, self.command)
+        response_body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', "application/json")
+        self.send_header('Content-Length', str(response_body.__len__()))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockNimOSServer(object):
+    """Serves a MockNimOS over HTTPS on localhost, with a self-signed certificate made for the server.
+
+    The requests go through the MockNimOS transport, so they are counted and delayed the same way. Use it as a context
+    manager, or call start() and stop().
+    """
+
+    def __init__(self, group, host="127.0.0.1", port=0):
+        self.group = group
+        self.host = host
+        self._cert_dir = tempfile.mkdtemp(prefix="mock_nimos_")
+        self._httpd = ThreadingHTTPServer((host, port), MockNimOSRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.group = group
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*self._make_certificate())
+        self._httpd.socket = context.wrap_socket(self._httpd.socket, server_side=True)
+        self.port = self._httpd.server_address[1]
+        self._thread = None
+
+    def _make_certificate(self):
+        # cryptography comes with ansible-core
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "mock-nimos")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+                .serial_number(x509.random_serial_number()).not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256()))
+        cert_path = os.path.join(self._cert_dir, "cert.pem")
+        key_path = os.path.join(self._cert_dir, "key.pem")
+        with open(cert_path, 'wb') as cert_file:
+            cert_file.write(cert.public_bytes(serialization.Encoding.PEM))
+        with open(key_path, 'wb') as key_file:
+            key_file.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+        return cert_path, key_path
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        shutil.rmtree(self._cert_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()